@@ -1,6 +1,12 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
 
 
 class ElevatorAppConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "elevator_app"
+
+    def ready(self):
+        from .middleware import install_query_recorder
+
+        connection_created.connect(install_query_recorder)
@@ -0,0 +1,56 @@
+"""
+Moves the served requests out of the hot `ElevatorRequest` table, which then
+only holds the pending & recently served ones the scheduler & the APIs work on,
+into `ArchivedElevatorRequest`. Run by the `archive_served_requests` command.
+"""
+
+from django.db import transaction
+from django.utils import timezone
+from .models import ArchivedElevatorRequest, ElevatorRequest, ElevatorSystem
+
+ARCHIVED_FIELD_NAMES = [
+    field.attname
+    for field in ArchivedElevatorRequest._meta.concrete_fields
+    if field.name != "archived_on"
+]
+ARCHIVE_BATCH_SIZE = 5000
+
+
+@transaction.atomic
+def archive_batch(served_before, batch_size=ARCHIVE_BATCH_SIZE):
+    """
+    Moves up to `batch_size` requests served before `served_before` to the archive
+    with one INSERT & one DELETE. Returns the number of requests moved.
+    """
+    rows = list(
+        ElevatorRequest.objects.filter(served_on__lt=served_before)
+        .order_by("pk")
+        .values(*ARCHIVED_FIELD_NAMES)[:batch_size]
+    )
+    if not rows:
+        return 0
+    archived_on = timezone.now()
+    ArchivedElevatorRequest.objects.bulk_create(
+        [ArchivedElevatorRequest(**row, archived_on=archived_on) for row in rows],
+        ignore_conflicts=True,
+    )
+    ElevatorRequest.objects.filter(pk__in=[row["id"] for row in rows]).delete()
+    # The archived requests leave the `all_requests` of their systems, whose
+    # ETags are derived from `updated`.
+    ElevatorSystem.objects.filter(
+        pk__in={row["elevator_system_id"] for row in rows}
+    ).update(updated=archived_on)
+    return len(rows)
+
+
+def archive_served_requests(served_before, batch_size=ARCHIVE_BATCH_SIZE):
+    """
+    Moves every request served before `served_before` to the archive, one
+    transaction per batch. Returns the number of requests moved.
+    """
+    archived_count = 0
+    while True:
+        batch_count = archive_batch(served_before, batch_size)
+        archived_count += batch_count
+        if batch_count < batch_size:
+            return archived_count
@@ -0,0 +1,253 @@
+import asyncio
+import json
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.views import View
+from rest_framework.renderers import JSONRenderer
+from .serializers import (
+    ElevatorSystemIntanceSerializer,
+    FastElevatorSystemStateSerializer,
+)
+from .models import ElevatorSystem
+from .elevator_logic import ElevatorLogic
+from .broadcaster import state_broadcaster
+from .station_cache import station_cache
+from .views import ConditionalRetrieveMixin
+from . import messages
+
+
+@sync_to_async
+def render_json(get_payload, headers=None):
+    """
+    Builds & renders the payload the same way as the DRF views. Serializers use
+    the sync ORM, so this runs in a worker thread.
+    """
+    return HttpResponse(
+        JSONRenderer().render(get_payload()),
+        content_type="application/json",
+        headers=headers,
+    )
+
+
+def render_state(elevator_system, message, **extra):
+    return render_json(
+        lambda: {
+            "message": message,
+            **extra,
+            "Elevator Current State": FastElevatorSystemStateSerializer(
+                elevator_system
+            ).data,
+        }
+    )
+
+
+class AsyncElevatorSystemView(View):
+    """
+    Base for the async variants of the elevator system APIs, served via ASGI.
+    Gives the same responses as their DRF counterparts in `views.py`.
+    """
+
+    http_method_names = ["get", "patch", "options"]
+    queryset = ElevatorSystem.objects.select_related("curr_station")
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        view.csrf_exempt = True
+        return view
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            return await super().dispatch(request, *args, **kwargs)
+        except ElevatorSystem.DoesNotExist:
+            return HttpResponse(
+                JSONRenderer().render({"detail": "Not found."}),
+                content_type="application/json",
+                status=404,
+            )
+
+    async def get_elevator_system(self, pk):
+        return await self.queryset.aget(pk=pk)
+
+
+class AsyncElevatorSystemInstanceView(
+    ConditionalRetrieveMixin, AsyncElevatorSystemView
+):
+    """
+    Same ETags, 304s & cached data as `ElevatorSystemInstanceView`.
+    """
+
+    async def get(self, request, pk):
+        elevator_system = await self.get_elevator_system(pk)
+        headers = self.get_conditional_headers(elevator_system)
+        if self.is_not_modified(request, headers["ETag"]):
+            return HttpResponse(status=304, headers=headers)
+        cache_key = self.get_cache_key(headers["ETag"])
+        data = await cache.aget(cache_key)
+        if data is not None:
+            return await render_json(lambda: data, headers)
+
+        def get_data():
+            data = ElevatorSystemIntanceSerializer(elevator_system).data
+            cache.set(cache_key, data, self.get_cache_timeout(elevator_system))
+            return data
+
+        return await render_json(get_data, headers)
+
+
+class ElevatorSystemStateStreamView(AsyncElevatorSystemView):
+    """
+    Server-Sent Events stream of an elevator system's live state. The first event
+    carries the full state, the following ones only the keys that changed.
+    Streams end after `max_stream_seconds`, as Django does not notice clients
+    that went away, EventSource clients reconnect on their own.
+    """
+
+    keep_alive_seconds = 15
+    max_stream_seconds = 300
+
+    async def get(self, request, pk):
+        elevator_system = await self.get_elevator_system(pk)
+        initial_state = state_broadcaster.get_state(elevator_system.pk)
+        if initial_state is None:
+            initial_state = await sync_to_async(ElevatorLogic.get_live_state)(
+                elevator_system
+            )
+        response = StreamingHttpResponse(
+            self.events(elevator_system.pk, initial_state),
+            content_type="text/event-stream",
+        )
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+    async def events(self, elevator_system_id, initial_state):
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+        state = state_broadcaster.subscribe(
+            elevator_system_id, loop, queue, initial_state
+        )
+        ends_at = loop.time() + self.max_stream_seconds
+        try:
+            yield f"data: {json.dumps(state)}\n\n"
+            while loop.time() < ends_at:
+                try:
+                    diff = await asyncio.wait_for(
+                        queue.get(),
+                        timeout=min(self.keep_alive_seconds, ends_at - loop.time()),
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"data: {json.dumps(diff)}\n\n"
+        finally:
+            state_broadcaster.unsubscribe(elevator_system_id, loop, queue)
+
+
+class AsyncMoveElevator(AsyncElevatorSystemView):
+    async def patch(self, request, pk):
+        elevator_system = await self.get_elevator_system(pk)
+        elevator_system, reached_station, served_req_ids = await sync_to_async(
+            ElevatorLogic.move_elevator
+        )(elevator_system)
+        if reached_station is None:
+            return await render_state(elevator_system, messages.NO_REQUESTS_TO_MOVE)
+        return await render_state(
+            elevator_system,
+            messages.ELEVATOR_MOVED.format(floor_no=reached_station.floor_no),
+            **{"Served Requests": served_req_ids},
+        )
+
+
+class AsyncCallElevator(AsyncElevatorSystemView):
+    async def patch(self, request, pk, from_floor_no):
+        elevator_system = await self.get_elevator_system(pk)
+        curr_station = elevator_system.curr_station
+        if curr_station.floor_no == from_floor_no:
+            return await render_state(
+                elevator_system,
+                messages.ALREADY_ON_CALLED_FLOOR.format(floor_no=curr_station.floor_no),
+            )
+        from_station = await station_cache.aget_station(elevator_system, from_floor_no)
+        if not from_station:
+            return await render_state(
+                elevator_system,
+                messages.STATIONS_COUNT_EXCEEDED.format(
+                    stations_count=elevator_system.stations_count
+                ),
+            )
+        if from_station.under_maintenance_since:
+            return await render_state(
+                elevator_system,
+                messages.CALLED_STATION_UNDER_MAINTENANCE.format(
+                    floor_no=curr_station.floor_no
+                ),
+            )
+        _, merged = await sync_to_async(ElevatorLogic.save_call)(
+            elevator_system, from_station
+        )
+        return await render_state(
+            elevator_system,
+            (
+                messages.CALL_MERGED.format(floor_no=from_floor_no)
+                if merged
+                else messages.CALL_SAVED
+            ),
+        )
+
+
+class AsyncSelectFloorView(AsyncElevatorSystemView):
+    async def patch(self, request, pk, to_floor_no):
+        elevator_system = await self.get_elevator_system(pk)
+        curr_station = elevator_system.curr_station
+        to_station = await station_cache.aget_station(elevator_system, to_floor_no)
+        if not to_station:
+            return await render_state(
+                elevator_system,
+                messages.STATIONS_COUNT_EXCEEDED.format(
+                    stations_count=elevator_system.stations_count
+                ),
+            )
+        if to_station.under_maintenance_since:
+            return await render_state(
+                elevator_system,
+                messages.SELECTED_STATION_UNDER_MAINTENANCE.format(
+                    floor_no=curr_station.floor_no
+                ),
+            )
+        if curr_station.floor_no == to_floor_no:
+            return await render_state(
+                elevator_system,
+                messages.ALREADY_ON_SELECTED_FLOOR.format(
+                    floor_no=curr_station.floor_no
+                ),
+            )
+        await sync_to_async(ElevatorLogic.save_select)(elevator_system, to_station)
+        return await render_state(elevator_system, messages.SELECT_SAVED)
+
+
+class AsyncMarkStationUnderMaintenanceView(AsyncElevatorSystemView):
+    async def patch(self, request, pk, floor_no, flag):
+        elevator_system = await self.get_elevator_system(pk)
+        station = await station_cache.aget_station(elevator_system, floor_no)
+        if not station:
+            return await render_state(
+                elevator_system,
+                messages.STATIONS_COUNT_EXCEEDED.format(
+                    stations_count=elevator_system.stations_count
+                ),
+            )
+        if flag == "true/":
+            if not station.under_maintenance_since:
+                station.under_maintenance_since = timezone.now()
+        else:
+            station.under_maintenance_since = None
+        await sync_to_async(ElevatorLogic.save_maintenance)(elevator_system, station)
+        return await render_state(
+            elevator_system,
+            messages.MAINTENANCE_TOGGLED.format(
+                floor_no=floor_no, marked="marked" if flag else "unmarked"
+            ),
+        )
@@ -0,0 +1,83 @@
+"""
+Vectorized LOOK scheduling of many elevator systems at once.
+
+The pending floors of `n` systems are given as a CSR matrix: the sorted, unique
+floors of system `i` are `floors[indptr[i]:indptr[i + 1]]`. Results match
+`LookStrategy.next_stop` of every system, promoted floors included.
+"""
+
+import itertools
+import numpy as np
+
+NO_FLOOR = -1
+
+
+def csr_matrix(rows):
+    """
+    Builds the `indptr` & `floors` arrays out of a list of sorted floor lists.
+    """
+    indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+    np.cumsum([len(row) for row in rows], out=indptr[1:])
+    floors = np.fromiter(
+        itertools.chain.from_iterable(rows), dtype=np.int64, count=indptr[-1]
+    )
+    return indptr, floors
+
+
+def _neighbours(curr_floors, indptr, floors):
+    """
+    Nearest pending floor strictly above & below the current floor of each system,
+    `NO_FLOOR` where there is none.
+    """
+    if not len(floors):
+        no_floors = np.full(len(curr_floors), NO_FLOOR, dtype=np.int64)
+        return no_floors, no_floors
+    # Offsetting the floors of system `i` by `i * stride` keeps the whole matrix
+    # sorted, so a single `searchsorted` finds the neighbours of every system.
+    stride = int(max(floors.max(), curr_floors.max())) + 1
+    rows = np.arange(len(curr_floors), dtype=np.int64)
+    keys = np.repeat(rows, np.diff(indptr)) * stride + floors
+    curr_keys = rows * stride + curr_floors
+    above_pos = np.searchsorted(keys, curr_keys, side="right")
+    below_pos = np.searchsorted(keys, curr_keys, side="left") - 1
+    above = np.where(
+        above_pos < indptr[1:],
+        floors[np.minimum(above_pos, len(floors) - 1)],
+        NO_FLOOR,
+    )
+    below = np.where(
+        below_pos >= indptr[:-1], floors[np.maximum(below_pos, 0)], NO_FLOOR
+    )
+    return above, below
+
+
+def next_floors(
+    curr_floors, going_up, indptr, floors, promoted_indptr, promoted_floors
+):
+    """
+    Returns the next floor (`NO_FLOOR` when idle) and whether the elevator goes
+    up to it, for each system. `promoted_*` is the CSR matrix of promoted floors.
+    """
+    curr_floors = np.asarray(curr_floors, dtype=np.int64)
+    going_up = np.asarray(going_up, dtype=bool)
+    above, below = _neighbours(curr_floors, indptr, floors)
+    look_up = np.where(going_up, above != NO_FLOOR, below == NO_FLOOR)
+    next_floor = np.where(look_up, above, below)
+
+    promoted_above, promoted_below = _neighbours(
+        curr_floors, promoted_indptr, promoted_floors
+    )
+    has_promoted_above = promoted_above != NO_FLOOR
+    has_promoted_below = promoted_below != NO_FLOOR
+    above_distance = promoted_above - curr_floors
+    below_distance = curr_floors - promoted_below
+    take_above = has_promoted_above & (
+        ~has_promoted_below
+        | (above_distance < below_distance)
+        | ((above_distance == below_distance) & going_up)
+    )
+    has_promoted = has_promoted_above | has_promoted_below
+    next_floor = np.where(
+        has_promoted, np.where(take_above, promoted_above, promoted_below), next_floor
+    )
+    return next_floor, np.where(has_promoted, take_above, look_up)
@@ -0,0 +1,58 @@
+import threading
+
+
+class StateBroadcaster:
+    """
+    In-process fan-out of elevator system state changes to async subscribers.
+    Every publish is diffed against the last published state of the system and
+    only the changed keys are pushed to each subscriber's queue.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = {}
+        self._states = {}
+
+    def has_subscribers(self, elevator_system_id):
+        return bool(self._subscribers.get(elevator_system_id))
+
+    def get_state(self, elevator_system_id):
+        with self._lock:
+            return self._states.get(elevator_system_id)
+
+    def subscribe(self, elevator_system_id, loop, queue, initial_state):
+        """
+        Registers `queue` (owned by the event `loop`) for the changes of the system,
+        returns the state the subscriber should start from.
+        """
+        with self._lock:
+            self._subscribers.setdefault(elevator_system_id, set()).add((loop, queue))
+            return self._states.setdefault(elevator_system_id, initial_state)
+
+    def unsubscribe(self, elevator_system_id, loop, queue):
+        with self._lock:
+            subscribers = self._subscribers.get(elevator_system_id, set())
+            subscribers.discard((loop, queue))
+            if not subscribers:
+                self._subscribers.pop(elevator_system_id, None)
+                self._states.pop(elevator_system_id, None)
+
+    def publish(self, elevator_system_id, state):
+        with self._lock:
+            subscribers = list(self._subscribers.get(elevator_system_id, ()))
+            if not subscribers:
+                return
+            prev_state = self._states.get(elevator_system_id, {})
+            diff = {
+                key: value
+                for key, value in state.items()
+                if prev_state.get(key) != value
+            }
+            if not diff:
+                return
+            self._states[elevator_system_id] = state
+        for loop, queue in subscribers:
+            loop.call_soon_threadsafe(queue.put_nowait, diff)
+
+
+state_broadcaster = StateBroadcaster()
@@ -0,0 +1,21 @@
+"""
+Parsing of the ISO 8601 datetimes accepted by the history APIs & commands.
+"""
+
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+
+def parse_aware_datetime(value):
+    """
+    `value` as an aware datetime, in the current time zone if it has no offset.
+    Returns `None` if it isn't a valid ISO 8601 datetime.
+    """
+    try:
+        parsed = parse_datetime(value)
+    except ValueError:
+        # Well formatted but invalid, e.g. a 13th month.
+        return None
+    if parsed is not None and timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
@@ -1,44 +1,877 @@
-from django.db.models import Case, When
-from .models import Directions
+import bisect
+import threading
+from collections import namedtuple
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Case, When, Q, F
+from django.utils import timezone
+from .models import Directions, ElevatorSystem, ElevatorStation, ElevatorRequest
+from .broadcaster import state_broadcaster
+from . import batch_scheduler, event_log, metrics
+
+NextStop = namedtuple("NextStop", ("floor_no", "station_id"))
+ElevatorMove = namedtuple(
+    "ElevatorMove", ("elevator_system", "reached_station", "served_req_ids")
+)
+
+
+class PendingFloorIndex:
+    """
+    Sorted index of the floors an `ElevatorSystem` still has to stop at.
+    `stamp` is the `ElevatorSystem.updated` value this index is valid for.
+    Floors of requests skipped more than `settings.SKIPS_ALLOWED_PER_REQ` times
+    are promoted: they are served first, nearest first, whatever the direction.
+    Indexes shared between threads are never mutated, see `copy`.
+    """
+
+    def __init__(self, stamp=None):
+        self.stamp = stamp
+        self._floors = []
+        self._promoted_floors = []
+        self._stations = {}
+        self._req_counts = {}
+        self._oldest_req_ids = {}
+        self.pending_count = 0
+
+    @staticmethod
+    def _target_annotations():
+        return {
+            "target_floor_no": Case(
+                When(to_station=None, then="from_station__floor_no"),
+                default="to_station__floor_no",
+            ),
+            "target_station_id": Case(
+                When(to_station=None, then="from_station_id"),
+                default="to_station_id",
+            ),
+        }
+
+    @classmethod
+    def for_elevator_systems(cls, elevator_systems):
+        """
+        Builds the indexes of all `elevator_systems` with a single query.
+        """
+        indexes = {
+            elevator_system.pk: cls(elevator_system.updated)
+            for elevator_system in elevator_systems
+        }
+        targets = (
+            ElevatorRequest.objects.pending()
+            .filter(elevator_system__in=indexes.keys())
+            .annotate(**cls._target_annotations())
+            .values_list(
+                "elevator_system_id",
+                "target_floor_no",
+                "target_station_id",
+                "skip_count",
+                "id",
+            )
+        )
+        for elevator_system_id, floor_no, station_id, skip_count, req_id in targets:
+            indexes[elevator_system_id].add(
+                floor_no,
+                station_id,
+                promoted=skip_count > settings.SKIPS_ALLOWED_PER_REQ,
+                req_id=req_id,
+            )
+        return indexes
+
+    def __len__(self):
+        return len(self._floors)
+
+    def copy(self, stamp):
+        """
+        A copy valid for `stamp`, to `add` to & swap in place of a shared index
+        that other threads may be reading without the lock.
+        """
+        index = PendingFloorIndex(stamp)
+        index._floors = list(self._floors)
+        index._promoted_floors = list(self._promoted_floors)
+        index._stations = dict(self._stations)
+        index._req_counts = dict(self._req_counts)
+        index._oldest_req_ids = dict(self._oldest_req_ids)
+        index.pending_count = self.pending_count
+        return index
+
+    def add(self, floor_no, station_id, promoted=False, req_id=None):
+        if floor_no not in self._req_counts:
+            # Station first, a floor must never be listed without its station.
+            self._stations[floor_no] = station_id
+            self._req_counts[floor_no] = 0
+            bisect.insort(self._floors, floor_no)
+        self._req_counts[floor_no] += 1
+        if req_id is not None and (
+            floor_no not in self._oldest_req_ids
+            or req_id < self._oldest_req_ids[floor_no]
+        ):
+            self._oldest_req_ids[floor_no] = req_id
+        self.pending_count += 1
+        i = bisect.bisect_left(self._promoted_floors, floor_no)
+        if promoted and self._promoted_floors[i : i + 1] != [floor_no]:
+            self._promoted_floors.insert(i, floor_no)
+
+    def nearest_above(self, floor_no):
+        i = bisect.bisect_right(self._floors, floor_no)
+        if i < len(self._floors):
+            return self._floors[i]
+        return None
+
+    def nearest_below(self, floor_no):
+        i = bisect.bisect_left(self._floors, floor_no)
+        if i > 0:
+            return self._floors[i - 1]
+        return None
+
+    def count_between(self, low_floor_no, high_floor_no):
+        """
+        Number of pending floors strictly between the two floors.
+        """
+        if low_floor_no >= high_floor_no:
+            return 0
+        return max(
+            0,
+            bisect.bisect_left(self._floors, high_floor_no)
+            - bisect.bisect_right(self._floors, low_floor_no),
+        )
+
+    @property
+    def lowest(self):
+        return self._floors[0] if self._floors else None
+
+    @property
+    def highest(self):
+        return self._floors[-1] if self._floors else None
+
+    @property
+    def oldest_floor(self):
+        """
+        Floor of the oldest pending request, request ids follow the arrival order.
+        """
+        if not self._oldest_req_ids:
+            return self.lowest
+        return min(self._oldest_req_ids, key=self._oldest_req_ids.get)
+
+    def nearest_stop(self, floor_no, direction, floors=None):
+        """
+        Nearest of the pending `floors` (all by default) in either direction,
+        ties go to the current `direction`.
+        """
+        floors = self._floors if floors is None else floors
+        i = bisect.bisect_left(floors, floor_no)
+        j = bisect.bisect_right(floors, floor_no)
+        below = floors[i - 1] if i > 0 else None
+        above = floors[j] if j < len(floors) else None
+        if below is None and above is None:
+            return None, direction
+        if below is None or (
+            above is not None
+            and (above - floor_no, direction != Directions.UP)
+            < (floor_no - below, direction != Directions.DOWN)
+        ):
+            return self.stop_at(above), Directions.UP
+        return self.stop_at(below), Directions.DOWN
+
+    def next_promoted_stop(self, floor_no, direction):
+        return self.nearest_stop(floor_no, direction, self._promoted_floors)
+
+    def look_stop(self, floor_no, direction):
+        """
+        Nearest floor in the current direction, reverses when there is none left.
+        """
+        above = self.nearest_above(floor_no)
+        below = self.nearest_below(floor_no)
+        if direction == Directions.UP:
+            if above is None:
+                return self.stop_at(below), Directions.DOWN
+            return self.stop_at(above), Directions.UP
+        else:
+            if below is None:
+                return self.stop_at(above), Directions.UP
+            return self.stop_at(below), Directions.DOWN
+
+    def next_stop(self, floor_no, direction):
+        if self._promoted_floors:
+            next_stop, next_direction = self.next_promoted_stop(floor_no, direction)
+            if next_stop is not None:
+                return next_stop, next_direction
+        return self.look_stop(floor_no, direction)
+
+    def stop_at(self, floor_no):
+        if floor_no is None:
+            return None
+        return NextStop(floor_no, self._stations[floor_no])
+
+
+class SchedulingStrategy:
+    """
+    Base of the policies picking the next stop of an elevator system, selected
+    per system by `ElevatorSystem.scheduling_strategy`. Strategies only read the
+    system's `PendingFloorIndex`, they never query the database.
+    Subclass it, override `pick` and decorate it with `register_scheduling_strategy`
+    to add a custom policy.
+    """
+
+    name = None
+
+    def next_stop(self, index, floor_no, direction, elevator_system):
+        """
+        Returns the next `NextStop` (`None` when idle) and the direction to it.
+        Promoted floors, see `PendingFloorIndex`, go first whatever the policy.
+        """
+        if not index:
+            return index.look_stop(floor_no, direction)
+        next_stop, next_direction = index.next_promoted_stop(floor_no, direction)
+        if next_stop is not None:
+            return next_stop, next_direction
+        return self.pick(index, floor_no, direction, elevator_system)
+
+    def pick(self, index, floor_no, direction, elevator_system):
+        raise NotImplementedError
+
+
+SCHEDULING_STRATEGIES = {}
+DEFAULT_SCHEDULING_STRATEGY = "LOOK"
+
+
+def register_scheduling_strategy(strategy_class):
+    SCHEDULING_STRATEGIES[strategy_class.name] = strategy_class()
+    return strategy_class
+
+
+def get_scheduling_strategy(name):
+    """
+    Unknown names, e.g. of a custom strategy no longer registered, fall back to
+    the default strategy.
+    """
+    return SCHEDULING_STRATEGIES.get(
+        name, SCHEDULING_STRATEGIES[DEFAULT_SCHEDULING_STRATEGY]
+    )
+
+
+def is_skipped(target_floor_no, floor_no, direction, next_floor_no, next_direction):
+    """
+    Whether a move from `floor_no` to `next_floor_no` skips a request to
+    `target_floor_no`: the car passes over it without stopping, or turns around
+    before reaching it, i.e. at most once per sweep leaving it behind.
+    """
+    if min(floor_no, next_floor_no) < target_floor_no < max(floor_no, next_floor_no):
+        return True
+    if next_direction == direction:
+        return False
+    if direction == Directions.UP:
+        return target_floor_no > floor_no
+    return target_floor_no < floor_no
+
+
+@register_scheduling_strategy
+class LookStrategy(SchedulingStrategy):
+    """
+    Keeps going in the current direction while there are pending floors ahead.
+    """
+
+    name = "LOOK"
+
+    def pick(self, index, floor_no, direction, elevator_system):
+        return index.look_stop(floor_no, direction)
+
+
+@register_scheduling_strategy
+class ScanStrategy(SchedulingStrategy):
+    """
+    Like LOOK, but sweeps to the last floor of the shaft before reversing.
+    The stops at the end floors have no `station_id`, see `ElevatorLogic.move_elevators`.
+    """
+
+    name = "SCAN"
+
+    def pick(self, index, floor_no, direction, elevator_system):
+        if direction == Directions.UP:
+            end_floor_no, next_floor_no = (
+                elevator_system.stations_count,
+                index.nearest_above(floor_no),
+            )
+        else:
+            end_floor_no, next_floor_no = 1, index.nearest_below(floor_no)
+        if next_floor_no is not None:
+            return index.stop_at(next_floor_no), direction
+        if floor_no != end_floor_no:
+            return NextStop(end_floor_no, None), direction
+        return index.look_stop(floor_no, direction)
+
+
+@register_scheduling_strategy
+class SstfStrategy(SchedulingStrategy):
+    """
+    Shortest seek time first: the nearest pending floor, whatever the direction.
+    """
+
+    name = "SSTF"
+
+    def pick(self, index, floor_no, direction, elevator_system):
+        return index.nearest_stop(floor_no, direction)
+
+
+@register_scheduling_strategy
+class FcfsStrategy(SchedulingStrategy):
+    """
+    First come first served: the floor of the oldest pending request.
+    """
+
+    name = "FCFS"
+
+    def pick(self, index, floor_no, direction, elevator_system):
+        oldest_floor_no = index.oldest_floor
+        if oldest_floor_no == floor_no:
+            return index.look_stop(floor_no, direction)
+        return index.stop_at(oldest_floor_no), (
+            Directions.UP if oldest_floor_no > floor_no else Directions.DOWN
+        )
+
+
+class CarDispatcher:
+    """
+    Assigns hall calls of an `ElevatorBank` to the car (`ElevatorSystem`) with the
+    lowest estimated time to arrival, measured in floors travelled plus
+    `STOP_COST` floors for every stop the car makes on its way.
+    """
+
+    STOP_COST = 2
+
+    @staticmethod
+    def estimate_time_to_arrival(floor_no, curr_floor_no, direction, index):
+        if floor_no == curr_floor_no:
+            return 0
+        next_stop, direction = index.next_stop(curr_floor_no, direction)
+        if next_stop is None:
+            return abs(floor_no - curr_floor_no)
+        if direction == Directions.UP:
+            if floor_no > curr_floor_no:
+                travel = floor_no - curr_floor_no
+                stops = index.count_between(curr_floor_no, floor_no)
+            else:
+                turn_floor_no = index.highest
+                travel = 2 * turn_floor_no - curr_floor_no - floor_no
+                stops = (
+                    index.count_between(curr_floor_no, turn_floor_no)
+                    + 1
+                    + index.count_between(floor_no, curr_floor_no)
+                )
+        else:
+            if floor_no < curr_floor_no:
+                travel = curr_floor_no - floor_no
+                stops = index.count_between(floor_no, curr_floor_no)
+            else:
+                turn_floor_no = index.lowest
+                travel = curr_floor_no + floor_no - 2 * turn_floor_no
+                stops = (
+                    index.count_between(turn_floor_no, curr_floor_no)
+                    + 1
+                    + index.count_between(curr_floor_no, floor_no)
+                )
+        return travel + CarDispatcher.STOP_COST * stops
+
+    @staticmethod
+    def assign(floor_no, cars, indexes):
+        """
+        Picks the car to serve a call from `floor_no` among `cars`, which must have
+        their `curr_station` loaded, using their pending floor `indexes`.
+        """
+        best_car, best_eta = None, None
+        for car in cars:
+            if not car.curr_station:
+                continue
+            eta = CarDispatcher.estimate_time_to_arrival(
+                floor_no,
+                car.curr_station.floor_no,
+                car.curr_direction,
+                indexes[car.pk],
+            )
+            if best_eta is None or eta < best_eta:
+                best_car, best_eta = car, eta
+        return best_car
 
 
 class ElevatorLogic:
+    """
+    Pending floors are kept in a process-local `PendingFloorIndex` per
+    elevator system. The database stays the source of truth: an index is
+    (re)built from `get_pending_requests()` the first time a system is seen
+    by this process and whenever the system's `updated` stamp moves on.
+    """
+
+    _indexes = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def get_pending_index(elevator_system):
+        return ElevatorLogic.get_pending_indexes([elevator_system])[elevator_system.pk]
+
+    @staticmethod
+    def get_pending_indexes(elevator_systems):
+        """
+        Same as `get_pending_index` for many systems, stale ones are rebuilt together.
+        """
+        indexes = {}
+        with ElevatorLogic._lock:
+            for elevator_system in elevator_systems:
+                index = ElevatorLogic._indexes.get(elevator_system.pk)
+                if index is not None and index.stamp == elevator_system.updated:
+                    indexes[elevator_system.pk] = index
+        stale_systems = [
+            elevator_system
+            for elevator_system in elevator_systems
+            if elevator_system.pk not in indexes
+        ]
+        if stale_systems:
+            rebuilt = PendingFloorIndex.for_elevator_systems(stale_systems)
+            with ElevatorLogic._lock:
+                ElevatorLogic._indexes.update(rebuilt)
+            indexes.update(rebuilt)
+        return indexes
+
+    @staticmethod
+    def _touch(elevator_system):
+        """
+        Bumps `elevator_system.updated` so every process drops its index.
+        Returns `True` if nobody else touched the system since it was loaded.
+        """
+        prev_stamp = elevator_system.updated
+        elevator_system.updated = timezone.now()
+        systems = ElevatorSystem.objects.filter(pk=elevator_system.pk)
+        if systems.filter(updated=prev_stamp).update(updated=elevator_system.updated):
+            return True
+        systems.update(updated=elevator_system.updated)
+        return False
+
+    @staticmethod
+    def record_request(elevator_system, elevator_req):
+        """
+        Call after saving a new pending `elevator_req` of `elevator_system`.
+        """
+        prev_stamp = elevator_system.updated
+        untouched = ElevatorLogic._touch(elevator_system)
+        target_station = elevator_req.to_station or elevator_req.from_station
+        with ElevatorLogic._lock:
+            index = ElevatorLogic._indexes.get(elevator_system.pk)
+            if untouched and index is not None and index.stamp == prev_stamp:
+                index = index.copy(elevator_system.updated)
+                index.add(
+                    target_station.floor_no, target_station.pk, req_id=elevator_req.pk
+                )
+                ElevatorLogic._indexes[elevator_system.pk] = index
+            else:
+                ElevatorLogic._indexes.pop(elevator_system.pk, None)
+        ElevatorLogic.publish_state(elevator_system)
+
     @staticmethod
-    def _get_next_request_in_direction(pending_req, elevator_system):
-        curr_direction = elevator_system.curr_direction
+    @transaction.atomic
+    def save_call(elevator_system, from_station):
+        """
+        Saves a call from `from_station`, or merges it into the pending call from
+        that station, as enforced by the `unique_pending_elevator_call` constraint.
+        Returns the new or pending call and whether it was merged.
+        """
+        try:
+            with transaction.atomic():
+                elevator_req = ElevatorRequest.objects.create(
+                    from_station=from_station, elevator_system=elevator_system
+                )
+        except IntegrityError:
+            pending_call = ElevatorRequest.objects.filter(
+                from_station=from_station, to_station=None, served_on=None
+            ).first()
+            if pending_call is None:
+                raise
+            pending_call.from_station = from_station
+            event_log.append([event_log.call_event(pending_call, merged=True)])
+            return pending_call, True
+        event_log.append([event_log.call_event(elevator_req)])
+        ElevatorLogic.record_request(elevator_system, elevator_req)
+        return elevator_req, False
+
+    @staticmethod
+    @transaction.atomic
+    def save_select(elevator_system, to_station):
+        """
+        Saves a selection of `to_station` from the current station, as the
+        destination of the pending call from there if any, or as a new request.
+        Returns the request.
+        """
         curr_station = elevator_system.curr_station
-        curr_floor_no = curr_station.floor_no
-        nearest_floor_no_case = Case(
-            When(to_station=None, then="from_station__floor_no"),
-            default="to_station__floor_no",
-        )
-        nearest_req_above = (
-            pending_req.annotate(nearest_floor_no=nearest_floor_no_case)
-            .filter(nearest_floor_no__gt=curr_floor_no)
-            .order_by("nearest_floor_no")
-            .first()
-        )
-        nearest_req_below = (
-            pending_req.annotate(nearest_floor_no=nearest_floor_no_case)
-            .filter(nearest_floor_no__lt=curr_floor_no)
-            .order_by("nearest_floor_no")
-            .last()
-        )
-        if curr_direction == Directions.UP:
-            if not nearest_req_above:
-                return nearest_req_below, Directions.DOWN
-            return nearest_req_above, Directions.UP
-        else:
-            if not nearest_req_below:
-                return nearest_req_above, Directions.UP
-            return nearest_req_below, Directions.DOWN
+        elevator_req = ElevatorRequest.objects.filter(
+            from_station=curr_station, to_station=None, served_on=None
+        ).first()
+        if elevator_req:
+            elevator_req.to_station = to_station
+            elevator_req.save()
+            event_log.append([event_log.select_event(elevator_req)])
+            ElevatorLogic.invalidate(elevator_system)
+            return elevator_req
+        elevator_req = ElevatorRequest.objects.create(
+            from_station=curr_station,
+            to_station=to_station,
+            elevator_system=elevator_system,
+        )
+        event_log.append([event_log.select_event(elevator_req)])
+        ElevatorLogic.record_request(elevator_system, elevator_req)
+        return elevator_req
 
     @staticmethod
-    def get_next_request(elevator_system):
+    @transaction.atomic
+    def save_maintenance(elevator_system, station):
+        """
+        Saves `station` after its `under_maintenance_since` was set or cleared.
+        Bumps both the `stations_updated` & `updated` stamps of `elevator_system`
+        with a single UPDATE, so every process drops its cached stations & index.
+        """
+        station.save()
+        event_log.append([event_log.maintenance_event(elevator_system, station)])
+        elevator_system.stations_updated = elevator_system.updated = timezone.now()
+        ElevatorSystem.objects.filter(pk=elevator_system.pk).update(
+            stations_updated=elevator_system.stations_updated,
+            updated=elevator_system.updated,
+        )
+        with ElevatorLogic._lock:
+            ElevatorLogic._indexes.pop(elevator_system.pk, None)
+        ElevatorLogic.publish_state(elevator_system)
+
+    @staticmethod
+    def record_requests(elevator_systems, elevator_reqs, edited_system_ids=()):
+        """
+        `record_request` for many new pending `elevator_reqs` of `elevator_systems`
+        at once, with a single UPDATE. The caller must hold row locks on the systems.
+        The indexes of `edited_system_ids`, whose pending requests were edited too,
+        are dropped instead.
+        """
+        touched_on = timezone.now()
+        ElevatorSystem.objects.filter(
+            pk__in=[elevator_system.pk for elevator_system in elevator_systems]
+        ).update(updated=touched_on)
+        new_reqs = {}
+        for elevator_req in elevator_reqs:
+            new_reqs.setdefault(elevator_req.elevator_system_id, []).append(
+                elevator_req
+            )
+        with ElevatorLogic._lock:
+            for elevator_system in elevator_systems:
+                index = ElevatorLogic._indexes.get(elevator_system.pk)
+                if (
+                    index is not None
+                    and index.stamp == elevator_system.updated
+                    and elevator_system.pk not in edited_system_ids
+                ):
+                    index = index.copy(touched_on)
+                    for elevator_req in new_reqs.get(elevator_system.pk, ()):
+                        target_station = (
+                            elevator_req.to_station or elevator_req.from_station
+                        )
+                        index.add(
+                            target_station.floor_no,
+                            target_station.pk,
+                            req_id=elevator_req.pk,
+                        )
+                    ElevatorLogic._indexes[elevator_system.pk] = index
+                else:
+                    ElevatorLogic._indexes.pop(elevator_system.pk, None)
+                elevator_system.updated = touched_on
+        for elevator_system in elevator_systems:
+            ElevatorLogic.publish_state(elevator_system)
+
+    @staticmethod
+    def invalidate(elevator_system):
+        """
+        Call after any other change to the pending requests of `elevator_system`,
+        i.e. edited requests or stations toggled under maintenance.
+        """
+        ElevatorLogic._touch(elevator_system)
+        with ElevatorLogic._lock:
+            ElevatorLogic._indexes.pop(elevator_system.pk, None)
+        ElevatorLogic.publish_state(elevator_system)
+
+    @staticmethod
+    def get_live_state(elevator_system):
+        """
+        A compact view of the state, as pushed to the state stream subscribers.
+        """
+        index = ElevatorLogic.get_pending_index(elevator_system)
+        next_stop, _ = ElevatorLogic.get_next_stop(elevator_system, index)
+        return {
+            "curr_floor_no": (
+                elevator_system.curr_station.floor_no
+                if elevator_system.curr_station
+                else None
+            ),
+            "curr_direction": elevator_system.curr_direction,
+            "nextstation": next_stop.floor_no if next_stop else "To Be Decided",
+            "pending_count": index.pending_count,
+        }
+
+    @staticmethod
+    def publish_state(elevator_system):
+        """
+        Pushes the state of `elevator_system` to its stream subscribers, if any,
+        once the current transaction commits.
+        """
+
+        def publish():
+            if state_broadcaster.has_subscribers(elevator_system.pk):
+                state_broadcaster.publish(
+                    elevator_system.pk, ElevatorLogic.get_live_state(elevator_system)
+                )
+
+        transaction.on_commit(publish)
+
+    @staticmethod
+    def get_next_stop(elevator_system, index=None):
         if not elevator_system.curr_station:
             return None, elevator_system.curr_direction
-        pending_reqs = elevator_system.get_pending_requests()
-        next_req, direction = ElevatorLogic._get_next_request_in_direction(
-            pending_reqs, elevator_system
-        )
+        with metrics.timed("scheduler"):
+            if index is None:
+                index = ElevatorLogic.get_pending_index(elevator_system)
+            return get_scheduling_strategy(
+                elevator_system.scheduling_strategy
+            ).next_stop(
+                index,
+                elevator_system.curr_station.floor_no,
+                elevator_system.curr_direction,
+                elevator_system,
+            )
+
+    BATCH_SCHEDULING_MIN_SYSTEMS = 64
+
+    @staticmethod
+    def get_next_stops(elevator_systems, indexes):
+        """
+        `get_next_stop` of many systems, keyed by system id. When there are enough
+        of them, the next stops of the LOOK systems are computed together by
+        `batch_scheduler`.
+        """
+        with metrics.timed("scheduler"):
+            look_systems = [
+                elevator_system
+                for elevator_system in elevator_systems
+                if elevator_system.curr_station
+                and type(get_scheduling_strategy(elevator_system.scheduling_strategy))
+                is LookStrategy
+            ]
+            if len(look_systems) < ElevatorLogic.BATCH_SCHEDULING_MIN_SYSTEMS:
+                return {
+                    elevator_system.pk: ElevatorLogic.get_next_stop(
+                        elevator_system, indexes[elevator_system.pk]
+                    )
+                    for elevator_system in elevator_systems
+                }
+            look_indexes = [
+                indexes[elevator_system.pk] for elevator_system in look_systems
+            ]
+            floors, going_up = batch_scheduler.next_floors(
+                [
+                    elevator_system.curr_station.floor_no
+                    for elevator_system in look_systems
+                ],
+                [
+                    elevator_system.curr_direction == Directions.UP
+                    for elevator_system in look_systems
+                ],
+                *batch_scheduler.csr_matrix([index._floors for index in look_indexes]),
+                *batch_scheduler.csr_matrix(
+                    [index._promoted_floors for index in look_indexes]
+                ),
+            )
+            next_stops = {}
+            for elevator_system, index, floor_no, up in zip(
+                look_systems, look_indexes, floors.tolist(), going_up.tolist()
+            ):
+                next_stops[elevator_system.pk] = (
+                    index.stop_at(
+                        None if floor_no == batch_scheduler.NO_FLOOR else floor_no
+                    ),
+                    Directions.UP if up else Directions.DOWN,
+                )
+            for elevator_system in elevator_systems:
+                if elevator_system.pk not in next_stops:
+                    next_stops[elevator_system.pk] = ElevatorLogic.get_next_stop(
+                        elevator_system, indexes[elevator_system.pk]
+                    )
+            return next_stops
+
+    @staticmethod
+    def get_next_request(elevator_system):
+        with metrics.timed("scheduler"):
+            next_stop, direction = ElevatorLogic.get_next_stop(elevator_system)
+            if next_stop is None or next_stop.station_id is None:
+                return None, direction
+            next_req = (
+                elevator_system.get_pending_requests()
+                .filter(
+                    Q(to_station_id=next_stop.station_id)
+                    | Q(to_station=None, from_station_id=next_stop.station_id)
+                )
+                .first()
+            )
         return next_req, direction
+
+    @staticmethod
+    def _record_skipped(next_stops, elevator_systems):
+        """
+        Increments, with a single UPDATE, the `skip_count` of the pending requests
+        the elevators skip on their way to `next_stops`, see `is_skipped`.
+        """
+        skipped = Q()
+        for elevator_system in elevator_systems:
+            if elevator_system.pk not in next_stops:
+                continue
+            next_stop, direction = next_stops[elevator_system.pk]
+            floor_no = elevator_system.curr_station.floor_no
+            skipped |= Q(
+                elevator_system=elevator_system.pk,
+                target_floor_no__gt=min(floor_no, next_stop.floor_no),
+                target_floor_no__lt=max(floor_no, next_stop.floor_no),
+            )
+            if direction != elevator_system.curr_direction:
+                if elevator_system.curr_direction == Directions.UP:
+                    floor_no_lookup = {"target_floor_no__gt": floor_no}
+                else:
+                    floor_no_lookup = {"target_floor_no__lt": floor_no}
+                skipped |= Q(elevator_system=elevator_system.pk, **floor_no_lookup)
+        if not skipped:
+            return
+        ElevatorRequest.objects.pending().annotate(
+            **PendingFloorIndex._target_annotations()
+        ).filter(skipped).update(skip_count=F("skip_count") + 1, updated=timezone.now())
+
+    @staticmethod
+    def _resolve_end_stops(next_stops, indexes, elevator_systems):
+        """
+        Fills in, with a single query, the stations of the stops without pending
+        requests (the end floors SCAN sweeps to). Elevators whose end station is
+        under maintenance turn around where they are instead.
+        """
+        end_floors = Q()
+        for elevator_system_id, (next_stop, _) in next_stops.items():
+            if next_stop.station_id is None:
+                end_floors |= Q(
+                    elevator_system=elevator_system_id, floor_no=next_stop.floor_no
+                )
+        if not end_floors:
+            return
+        end_stations = {
+            (elevator_system_id, floor_no): station_id
+            for elevator_system_id, floor_no, station_id in ElevatorStation.objects.filter(
+                end_floors, under_maintenance_since=None
+            ).values_list(
+                "elevator_system_id", "floor_no", "id"
+            )
+        }
+        for elevator_system in elevator_systems:
+            if elevator_system.pk not in next_stops:
+                continue
+            next_stop, direction = next_stops[elevator_system.pk]
+            if next_stop.station_id is not None:
+                continue
+            station_id = end_stations.get((elevator_system.pk, next_stop.floor_no))
+            if station_id is not None:
+                next_stops[elevator_system.pk] = (
+                    NextStop(next_stop.floor_no, station_id),
+                    direction,
+                )
+                continue
+            next_stop, direction = indexes[elevator_system.pk].look_stop(
+                elevator_system.curr_station.floor_no,
+                Directions.DOWN if direction == Directions.UP else Directions.UP,
+            )
+            if next_stop is None:
+                del next_stops[elevator_system.pk]
+            else:
+                next_stops[elevator_system.pk] = (next_stop, direction)
+
+    @staticmethod
+    def move_elevator(elevator_system):
+        """
+        Moves the elevator to its next stop and marks the pending requests to/from
+        the reached station as served, all under a row lock on `elevator_system`.
+        Returns the locked & updated elevator system, the reached station (`None`
+        if there was nothing to serve) and the ids of the served requests.
+        """
+        (elevator_move,) = ElevatorLogic.move_elevators([elevator_system.pk])
+        return elevator_move
+
+    @staticmethod
+    @transaction.atomic
+    def move_elevators(elevator_system_ids, skip_locked=False):
+        """
+        Moves the elevators of many systems by one stop each, using a fixed number
+        of queries whatever the number of systems. With `skip_locked` the systems
+        being moved by someone else are left out instead of waited for.
+        Returns an `ElevatorMove` per moved or examined system.
+        """
+        elevator_systems = list(
+            ElevatorSystem.objects.select_for_update(
+                of=("self",), skip_locked=skip_locked
+            )
+            .select_related("curr_station")
+            .filter(pk__in=elevator_system_ids)
+            .order_by("pk")
+        )
+        indexes = ElevatorLogic.get_pending_indexes(elevator_systems)
+        next_stops = {}
+        for elevator_system_id, (next_stop, direction) in ElevatorLogic.get_next_stops(
+            elevator_systems, indexes
+        ).items():
+            if next_stop is not None:
+                next_stops[elevator_system_id] = (next_stop, direction)
+        ElevatorLogic._resolve_end_stops(next_stops, indexes, elevator_systems)
+        reached_stations = ElevatorStation.objects.in_bulk(
+            [next_stop.station_id for next_stop, _ in next_stops.values()]
+        )
+        served_reqs = ElevatorRequest.objects.filter(
+            Q(to_station__in=reached_stations.keys())
+            | Q(from_station__in=reached_stations.keys()),
+            elevator_system__in=next_stops.keys(),
+            served_on=None,
+        )
+        served_req_ids = {}
+        for req_id, elevator_system_id in served_reqs.values_list(
+            "id", "elevator_system_id"
+        ):
+            served_req_ids.setdefault(elevator_system_id, []).append(req_id)
+        moved_on = timezone.now()
+        ElevatorRequest.objects.filter(
+            pk__in=[req_id for ids in served_req_ids.values() for req_id in ids],
+            served_on=None,
+        ).update(served_on=moved_on, updated=moved_on)
+        ElevatorLogic._record_skipped(next_stops, elevator_systems)
+
+        elevator_moves = []
+        moved_systems = []
+        events = []
+        for elevator_system in elevator_systems:
+            if elevator_system.pk not in next_stops:
+                elevator_moves.append(ElevatorMove(elevator_system, None, []))
+                continue
+            next_stop, direction = next_stops[elevator_system.pk]
+            reached_station = reached_stations[next_stop.station_id]
+            elevator_system.curr_direction = direction
+            elevator_system.curr_station = reached_station
+            elevator_system.updated = moved_on
+            moved_systems.append(elevator_system)
+            events.append(event_log.move_event(elevator_system, moved_on))
+            if elevator_system.pk in served_req_ids:
+                events.append(
+                    event_log.serve_event(
+                        elevator_system, served_req_ids[elevator_system.pk], moved_on
+                    )
+                )
+            ElevatorLogic.publish_state(elevator_system)
+            elevator_moves.append(
+                ElevatorMove(
+                    elevator_system,
+                    reached_station,
+                    served_req_ids.get(elevator_system.pk, []),
+                )
+            )
+        ElevatorSystem.objects.bulk_update(
+            moved_systems, ["curr_station", "curr_direction", "updated"]
+        )
+        event_log.append(events)
+        return elevator_moves
@@ -0,0 +1,213 @@
+"""
+Append-only log of the state changes of elevator systems.
+
+Every initiation, call, select, move, serve & maintenance toggle is appended as an
+`ElevatorEvent`, in the transaction of the change, with one bulk INSERT per batch
+of events. The state of a system (current station & direction, pending requests,
+stations under maintenance) is derived by replaying its events on top of its
+latest `ElevatorSystemSnapshot`, see `get_state` & `take_snapshots`.
+"""
+
+import itertools
+from datetime import timedelta
+from django.db.models import Max, Q
+from django.utils import timezone
+from .models import (
+    Directions,
+    ElevatorEvent,
+    ElevatorSystemSnapshot,
+    EventKinds,
+)
+
+SNAPSHOT_SETTLE_SECONDS = 60
+
+
+def initiate_event(elevator_system):
+    # Systems initiated without stations have no current station.
+    curr_station = elevator_system.curr_station
+    return ElevatorEvent(
+        elevator_system_id=elevator_system.pk,
+        kind=EventKinds.INITIATE,
+        station=curr_station,
+        floor_no=curr_station.floor_no if curr_station else None,
+        data={"direction": elevator_system.curr_direction},
+    )
+
+
+def call_event(elevator_req, merged=False):
+    return ElevatorEvent(
+        elevator_system_id=elevator_req.elevator_system_id,
+        kind=EventKinds.CALL,
+        station=elevator_req.from_station,
+        floor_no=elevator_req.from_station.floor_no,
+        data={"req_id": elevator_req.pk, "merged": merged},
+    )
+
+
+def select_event(elevator_req):
+    return ElevatorEvent(
+        elevator_system_id=elevator_req.elevator_system_id,
+        kind=EventKinds.SELECT,
+        station=elevator_req.to_station,
+        floor_no=elevator_req.to_station.floor_no,
+        data={"req_id": elevator_req.pk},
+    )
+
+
+def move_event(elevator_system, moved_on):
+    return ElevatorEvent(
+        elevator_system_id=elevator_system.pk,
+        kind=EventKinds.MOVE,
+        created=moved_on,
+        station=elevator_system.curr_station,
+        floor_no=elevator_system.curr_station.floor_no,
+        data={"direction": elevator_system.curr_direction},
+    )
+
+
+def serve_event(elevator_system, served_req_ids, served_on):
+    return ElevatorEvent(
+        elevator_system_id=elevator_system.pk,
+        kind=EventKinds.SERVE,
+        created=served_on,
+        station=elevator_system.curr_station,
+        floor_no=elevator_system.curr_station.floor_no,
+        data={"req_ids": served_req_ids},
+    )
+
+
+def maintenance_event(elevator_system, station):
+    return ElevatorEvent(
+        elevator_system_id=elevator_system.pk,
+        kind=EventKinds.MAINTENANCE,
+        station=station,
+        floor_no=station.floor_no,
+        data={"under_maintenance": station.under_maintenance_since is not None},
+    )
+
+
+def append(events):
+    ElevatorEvent.objects.bulk_create(events)
+
+
+def initial_state():
+    return {
+        "curr_station": None,
+        "curr_floor_no": None,
+        "curr_direction": Directions.UP.value,
+        "pending_req_ids": [],
+        "maintenance_station_ids": [],
+    }
+
+
+def replay(state, events):
+    """
+    Returns `state` with `events`, in log order, applied to it.
+    """
+    pending_req_ids = set(state["pending_req_ids"])
+    maintenance_station_ids = set(state["maintenance_station_ids"])
+    state = dict(state)
+    for event in events:
+        if event.kind in (EventKinds.INITIATE, EventKinds.MOVE):
+            state["curr_station"] = event.station_id
+            state["curr_floor_no"] = event.floor_no
+            state["curr_direction"] = event.data["direction"]
+        elif event.kind in (EventKinds.CALL, EventKinds.SELECT):
+            pending_req_ids.add(event.data["req_id"])
+        elif event.kind == EventKinds.SERVE:
+            pending_req_ids.difference_update(event.data["req_ids"])
+        elif event.kind == EventKinds.MAINTENANCE:
+            if event.data["under_maintenance"]:
+                maintenance_station_ids.add(event.station_id)
+            else:
+                maintenance_station_ids.discard(event.station_id)
+    state["pending_req_ids"] = sorted(pending_req_ids)
+    state["maintenance_station_ids"] = sorted(maintenance_station_ids)
+    return state
+
+
+def _latest_snapshots(elevator_system_ids):
+    return {
+        snapshot.elevator_system_id: snapshot
+        for snapshot in ElevatorSystemSnapshot.objects.filter(
+            pk__in=ElevatorSystemSnapshot.objects.filter(
+                elevator_system__in=elevator_system_ids
+            )
+            .values("elevator_system")
+            .annotate(latest_id=Max("pk"))
+            .values("latest_id")
+        )
+    }
+
+
+def _load(elevator_system_ids):
+    """
+    The latest snapshot of each system & the events appended since, by system id,
+    with one query each.
+    """
+    snapshots = _latest_snapshots(elevator_system_ids)
+    newer_events = Q()
+    for elevator_system_id in elevator_system_ids:
+        snapshot = snapshots.get(elevator_system_id)
+        newer_events |= Q(
+            elevator_system=elevator_system_id,
+            pk__gt=snapshot.last_event_id if snapshot else 0,
+        )
+    events = {}
+    if newer_events:
+        for event in ElevatorEvent.objects.filter(newer_events).order_by("pk"):
+            events.setdefault(event.elevator_system_id, []).append(event)
+    return snapshots, events
+
+
+def _replay_from(snapshot, events):
+    return replay(snapshot.state if snapshot else initial_state(), events)
+
+
+def get_states(elevator_system_ids):
+    """
+    The replayed state of many elevator systems, keyed by system id.
+    """
+    snapshots, events = _load(elevator_system_ids)
+    return {
+        elevator_system_id: _replay_from(
+            snapshots.get(elevator_system_id), events.get(elevator_system_id, [])
+        )
+        for elevator_system_id in elevator_system_ids
+    }
+
+
+def get_state(elevator_system_id):
+    return get_states([elevator_system_id])[elevator_system_id]
+
+
+def take_snapshots(elevator_system_ids, settled_before=None):
+    """
+    Snapshots the systems with events appended since their latest snapshot, so
+    their replay starts from there. Event ids are allocated on INSERT, not on
+    commit, so a snapshot stops at the first event created after `settled_before`
+    (default: `SNAPSHOT_SETTLE_SECONDS` ago), leaving a chance to transactions
+    still in flight to commit theirs. Returns the number of snapshots taken.
+    """
+    if settled_before is None:
+        settled_before = timezone.now() - timedelta(seconds=SNAPSHOT_SETTLE_SECONDS)
+    snapshots, events = _load(elevator_system_ids)
+    new_snapshots = []
+    for elevator_system_id, system_events in events.items():
+        settled_events = list(
+            itertools.takewhile(
+                lambda event: event.created <= settled_before, system_events
+            )
+        )
+        if settled_events:
+            new_snapshots.append(
+                ElevatorSystemSnapshot(
+                    elevator_system_id=elevator_system_id,
+                    last_event_id=settled_events[-1].pk,
+                    state=_replay_from(
+                        snapshots.get(elevator_system_id), settled_events
+                    ),
+                )
+            )
+    ElevatorSystemSnapshot.objects.bulk_create(new_snapshots)
+    return len(new_snapshots)
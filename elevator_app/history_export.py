@@ -0,0 +1,123 @@
+"""
+Compact columnar export of the request history, archived requests included.
+
+An export is a sequence of chunks of up to `EXPORT_BATCH_SIZE` requests. A chunk is
+one NumPy `.npy` array per column of `COLUMNS`, in that order, so exports can be
+streamed while they are written & read back chunk by chunk with `read_chunks`.
+Times are UTC `datetime64[us]`, `NaT` for requests not served yet, and floors are
+`NO_FLOOR` for calls without a destination yet.
+"""
+
+import io
+import itertools
+from datetime import datetime, timedelta, timezone as dt_timezone
+import numpy as np
+from .models import ArchivedElevatorRequest, ElevatorRequest
+
+COLUMNS = (
+    "id",
+    "elevator_system_id",
+    "created",
+    "served_on",
+    "from_floor_no",
+    "to_floor_no",
+    "skip_count",
+)
+COLUMN_LOOKUPS = (
+    "id",
+    "elevator_system_id",
+    "created",
+    "served_on",
+    "from_station__floor_no",
+    "to_station__floor_no",
+    "skip_count",
+)
+CONTENT_TYPE = "application/octet-stream"
+EXPORT_BATCH_SIZE = 100_000
+NO_FLOOR = -1
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+MICROSECOND = timedelta(microseconds=1)
+NAT = np.iinfo(np.int64).min
+
+
+def request_querysets(elevator_system=None, since=None, until=None):
+    """
+    The requests to export, from the hot table & the archive, optionally of one
+    elevator system and created within [`since`, `until`).
+    """
+    querysets = []
+    for model in (ElevatorRequest, ArchivedElevatorRequest):
+        elevator_reqs = model.objects.all()
+        if elevator_system is not None:
+            elevator_reqs = elevator_reqs.filter(elevator_system=elevator_system)
+        if since:
+            elevator_reqs = elevator_reqs.filter(created__gte=since)
+        if until:
+            elevator_reqs = elevator_reqs.filter(created__lt=until)
+        querysets.append(elevator_reqs)
+    return querysets
+
+
+def _datetime_column(values):
+    # Exact integer microseconds, several times faster than converting datetimes.
+    return np.array(
+        [NAT if value is None else (value - EPOCH) // MICROSECOND for value in values],
+        dtype=np.int64,
+    ).view("datetime64[us]")
+
+
+def encode_chunk(rows):
+    """
+    The `.npy` column arrays of `rows`, tuples of `COLUMN_LOOKUPS` values.
+    """
+    ids, system_ids, created, served_on, from_floors, to_floors, skips = zip(*rows)
+    columns = (
+        np.array(ids, dtype=np.int64),
+        np.array(system_ids, dtype=np.int64),
+        _datetime_column(created),
+        _datetime_column(served_on),
+        np.array(from_floors, dtype=np.int32),
+        np.array(
+            [NO_FLOOR if floor_no is None else floor_no for floor_no in to_floors],
+            dtype=np.int32,
+        ),
+        np.array(skips, dtype=np.int32),
+    )
+    buffer = io.BytesIO()
+    for column in columns:
+        np.lib.format.write_array(buffer, column, allow_pickle=False)
+    return buffer.getvalue()
+
+
+def export_chunks(querysets, batch_size=EXPORT_BATCH_SIZE):
+    """
+    Yields the encoded chunks of the requests of `querysets`, fetched through a
+    server-side cursor (on PostgreSQL) `batch_size` rows at a time, so memory
+    use does not grow with the size of the export.
+    """
+    for elevator_reqs in querysets:
+        rows = (
+            elevator_reqs.order_by("pk")
+            .values_list(*COLUMN_LOOKUPS)
+            .iterator(chunk_size=batch_size)
+        )
+        while True:
+            batch = list(itertools.islice(rows, batch_size))
+            if not batch:
+                break
+            yield encode_chunk(batch)
+
+
+def read_chunks(file):
+    """
+    Yields every chunk of an export read from `file` as a dict of column arrays.
+    """
+    while True:
+        try:
+            first_column = np.load(file, allow_pickle=False)
+        except EOFError:
+            return
+        chunk = {COLUMNS[0]: first_column}
+        for name in COLUMNS[1:]:
+            chunk[name] = np.load(file, allow_pickle=False)
+        yield chunk
@@ -0,0 +1,32 @@
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from elevator_app import archiver
+
+
+class Command(BaseCommand):
+    help = (
+        "Moves the requests served more than --older-than-days ago out of the hot "
+        "elevator request table into the archive. Run it periodically, e.g. from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--older-than-days",
+            type=float,
+            default=settings.ARCHIVE_SERVED_REQUESTS_AFTER_DAYS,
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=archiver.ARCHIVE_BATCH_SIZE,
+            help="Requests moved per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        served_before = timezone.now() - timedelta(days=options["older_than_days"])
+        archived_count = archiver.archive_served_requests(
+            served_before, options["batch_size"]
+        )
+        self.stdout.write(f"Archived {archived_count} served requests.")
@@ -0,0 +1,81 @@
+import json
+import random
+import time
+from django.core.management.base import BaseCommand
+from elevator_app import batch_scheduler
+from elevator_app.elevator_logic import PendingFloorIndex, SCHEDULING_STRATEGIES
+from elevator_app.models import Directions
+
+
+class Command(BaseCommand):
+    help = (
+        "Computes the LOOK next stops of randomized elevator systems one by one and "
+        "with the vectorized batch scheduler and prints the timings of both as "
+        "JSON. Needs no database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--systems", type=int, default=100_000)
+        parser.add_argument("--stations", type=int, default=50)
+        parser.add_argument(
+            "--pending", type=int, default=8, help="Max pending requests per system."
+        )
+        parser.add_argument(
+            "--promoted-ratio",
+            type=float,
+            default=0.05,
+            help="Share of the pending requests that are promoted.",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        stations_count = options["stations"]
+        curr_floors, directions, indexes = [], [], []
+        for _ in range(options["systems"]):
+            index = PendingFloorIndex()
+            for _ in range(rng.randint(0, options["pending"])):
+                floor_no = rng.randint(1, stations_count)
+                index.add(
+                    floor_no,
+                    floor_no,
+                    promoted=rng.random() < options["promoted_ratio"],
+                )
+            curr_floors.append(rng.randint(1, stations_count))
+            directions.append(rng.choice((Directions.UP, Directions.DOWN)))
+            indexes.append(index)
+
+        look_strategy = SCHEDULING_STRATEGIES["LOOK"]
+        started = time.process_time()
+        for index, floor_no, direction in zip(indexes, curr_floors, directions):
+            look_strategy.next_stop(index, floor_no, direction, None)
+        per_system_seconds = time.process_time() - started
+
+        started = time.process_time()
+        matrices = (
+            *batch_scheduler.csr_matrix([index._floors for index in indexes]),
+            *batch_scheduler.csr_matrix([index._promoted_floors for index in indexes]),
+        )
+        csr_seconds = time.process_time() - started
+        started = time.process_time()
+        batch_scheduler.next_floors(
+            curr_floors,
+            [direction == Directions.UP for direction in directions],
+            *matrices,
+        )
+        batch_seconds = time.process_time() - started
+
+        self.stdout.write(
+            json.dumps(
+                {
+                    "systems": options["systems"],
+                    "per_system_seconds": per_system_seconds,
+                    "csr_build_seconds": csr_seconds,
+                    "batch_seconds": batch_seconds,
+                    "speedup": (
+                        per_system_seconds / batch_seconds if batch_seconds else None
+                    ),
+                },
+                indent=2,
+            )
+        )
@@ -0,0 +1,98 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+from elevator_app.models import ElevatorSystem, ElevatorStation, ElevatorRequest
+
+
+class Command(BaseCommand):
+    help = (
+        "Seeds a throw-away elevator system with served request history and "
+        "prints the query plans of the pending request and station lookups "
+        "without and with the app's indexes. Everything is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--served", type=int, default=2_000_000)
+        parser.add_argument("--pending", type=int, default=20)
+        parser.add_argument("--stations", type=int, default=50)
+        parser.add_argument("--batch-size", type=int, default=10_000)
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError(
+                "This benchmark drops and re-creates indexes inside a transaction, "
+                "which needs PostgreSQL."
+            )
+        with transaction.atomic():
+            elevator_system = self._seed(**options)
+            floor_no = options["stations"] // 2
+            lookups = {
+                "pending requests": elevator_system.get_pending_requests(),
+                "station by floor": ElevatorStation.objects.filter(
+                    elevator_system=elevator_system, floor_no=floor_no
+                ),
+            }
+            with connection.schema_editor() as schema_editor:
+                self._drop_indexes(schema_editor)
+            self._explain("without indexes", lookups)
+            with connection.schema_editor() as schema_editor:
+                self._add_indexes(schema_editor)
+            self._analyze()
+            self._explain("with indexes", lookups)
+            transaction.set_rollback(True)
+
+    def _seed(self, served, pending, stations, batch_size, **options):
+        elevator_system = ElevatorSystem.objects.create(
+            stations_count=stations, building_name="Benchmark"
+        )
+        station_objs = ElevatorStation.objects.bulk_create(
+            ElevatorStation(elevator_system=elevator_system, floor_no=i + 1)
+            for i in range(stations)
+        )
+        served_on = timezone.now()
+        for start in range(0, served + pending, batch_size):
+            ElevatorRequest.objects.bulk_create(
+                ElevatorRequest(
+                    elevator_system=elevator_system,
+                    from_station=station_objs[i % stations],
+                    # One pending call per station, the other pending rows are
+                    # selects, see the `unique_pending_elevator_call` constraint.
+                    to_station=(
+                        station_objs[(i + 1) % stations]
+                        if i - served >= stations
+                        else None
+                    ),
+                    served_on=served_on if i < served else None,
+                )
+                for i in range(start, min(start + batch_size, served + pending))
+            )
+        self.stdout.write(f"Seeded {served} served and {pending} pending requests.")
+        self._analyze()
+        return elevator_system
+
+    def _drop_indexes(self, schema_editor):
+        for index in ElevatorRequest._meta.indexes:
+            schema_editor.remove_index(ElevatorRequest, index)
+        for constraint in ElevatorStation._meta.constraints:
+            schema_editor.remove_constraint(ElevatorStation, constraint)
+
+    def _add_indexes(self, schema_editor):
+        for index in ElevatorRequest._meta.indexes:
+            schema_editor.add_index(ElevatorRequest, index)
+        for constraint in ElevatorStation._meta.constraints:
+            schema_editor.add_constraint(ElevatorStation, constraint)
+
+    def _analyze(self):
+        with connection.cursor() as cursor:
+            for model in (ElevatorRequest, ElevatorStation):
+                cursor.execute(f"ANALYZE {model._meta.db_table}")
+
+    def _explain(self, title, lookups):
+        self.stdout.write(self.style.MIGRATE_HEADING(f"== {title} =="))
+        for name, queryset in lookups.items():
+            start = time.perf_counter()
+            list(queryset)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            self.stdout.write(f"-- {name}: {elapsed_ms:.2f} ms")
+            self.stdout.write(queryset.explain(analyze=True, buffers=True))
@@ -0,0 +1,57 @@
+import json
+import time
+from django.core.management.base import BaseCommand, CommandError
+from elevator_app.models import ElevatorSystem
+from elevator_app.serializers import (
+    ElevatorSystemStateSerializer,
+    FastElevatorSystemStateSerializer,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Serializes the state of existing elevator systems with the DRF & the fast "
+        "state serializers and prints the timings of both as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--systems", type=int, default=100, help="Elevator systems to serialize."
+        )
+        parser.add_argument(
+            "--repeat", type=int, default=10, help="Serializations per system."
+        )
+
+    def handle(self, *args, **options):
+        elevator_systems = list(
+            ElevatorSystem.objects.select_related("curr_station").order_by("pk")[
+                : options["systems"]
+            ]
+        )
+        if not elevator_systems:
+            raise CommandError("There are no elevator systems to serialize.")
+        timings = {}
+        for name, serializer_class in (
+            ("drf", ElevatorSystemStateSerializer),
+            ("fast", FastElevatorSystemStateSerializer),
+        ):
+            started = time.perf_counter()
+            for _ in range(options["repeat"]):
+                for elevator_system in elevator_systems:
+                    serializer_class(elevator_system).data
+            timings[name] = (
+                (time.perf_counter() - started)
+                * 1000
+                / (options["repeat"] * len(elevator_systems))
+            )
+        self.stdout.write(
+            json.dumps(
+                {
+                    "systems": len(elevator_systems),
+                    "drf_ms": timings["drf"],
+                    "fast_ms": timings["fast"],
+                    "speedup": timings["drf"] / timings["fast"],
+                },
+                indent=2,
+            )
+        )
@@ -0,0 +1,65 @@
+import sys
+from django.core.management.base import BaseCommand, CommandError
+from elevator_app import history_export
+from elevator_app.datetimes import parse_aware_datetime
+
+
+class Command(BaseCommand):
+    help = (
+        "Exports the request history, archived requests included, in the columnar "
+        "format of `elevator_app.history_export`: concatenated NumPy .npy column "
+        "chunks, read back with `history_export.read_chunks`."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output", help="File to write the export to, stdout if not given."
+        )
+        parser.add_argument("--elevator-system", type=int, help="Elevator system id.")
+        parser.add_argument(
+            "--since", help="Only requests created since this ISO 8601 datetime."
+        )
+        parser.add_argument(
+            "--until", help="Only requests created before this ISO 8601 datetime."
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=history_export.EXPORT_BATCH_SIZE,
+            help="Requests fetched & written per chunk.",
+        )
+
+    def _get_datetime_option(self, options, name):
+        if not options[name]:
+            return None
+        value = parse_aware_datetime(options[name])
+        if value is None:
+            raise CommandError(f"--{name} expects an ISO 8601 datetime.")
+        return value
+
+    def handle(self, *args, **options):
+        chunks = history_export.export_chunks(
+            history_export.request_querysets(
+                elevator_system=options["elevator_system"],
+                since=self._get_datetime_option(options, "since"),
+                until=self._get_datetime_option(options, "until"),
+            ),
+            options["batch_size"],
+        )
+        if options["output"]:
+            with open(options["output"], "wb") as output:
+                chunks_count, bytes_count = self._write(chunks, output)
+            self.stderr.write(
+                f"Exported {chunks_count} chunks, {bytes_count} bytes to {options['output']}."
+            )
+        else:
+            self._write(chunks, sys.stdout.buffer)
+
+    @staticmethod
+    def _write(chunks, output):
+        chunks_count = bytes_count = 0
+        for chunk in chunks:
+            output.write(chunk)
+            chunks_count += 1
+            bytes_count += len(chunk)
+        return chunks_count, bytes_count
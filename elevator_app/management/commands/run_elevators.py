@@ -0,0 +1,77 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.core.management.base import BaseCommand
+from django.db import connections
+from elevator_app.models import ElevatorRequest
+from elevator_app.elevator_logic import ElevatorLogic
+
+
+class Command(BaseCommand):
+    help = (
+        "Advances every elevator system with pending requests by one stop per "
+        "tick, until interrupted. Run it alongside `manage.py runserver`."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--tick", type=float, default=1.0, help="Seconds between two ticks."
+        )
+        parser.add_argument(
+            "--workers", type=int, default=4, help="Threads moving batches in parallel."
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Elevator systems moved together in one transaction.",
+        )
+        parser.add_argument(
+            "--ticks",
+            type=int,
+            default=0,
+            help="Stop after this many ticks, 0 = never.",
+        )
+
+    def handle(self, *args, **options):
+        tick, batch_size = options["tick"], options["batch_size"]
+        ticks_done = 0
+        with ThreadPoolExecutor(max_workers=options["workers"]) as pool:
+            try:
+                while not options["ticks"] or ticks_done < options["ticks"]:
+                    started = time.monotonic()
+                    moves_count = self._tick(pool, batch_size)
+                    elapsed = time.monotonic() - started
+                    ticks_done += 1
+                    self.stdout.write(
+                        f"Tick #{ticks_done}: moved {moves_count} elevators in {elapsed * 1000:.1f} ms"
+                    )
+                    time.sleep(max(0.0, tick - elapsed))
+            except KeyboardInterrupt:
+                self.stdout.write("Stopped.")
+
+    def _tick(self, pool, batch_size):
+        elevator_system_ids = list(
+            ElevatorRequest.objects.pending()
+            .values_list("elevator_system_id", flat=True)
+            .order_by("elevator_system_id")
+            .distinct()
+        )
+        batches = [
+            elevator_system_ids[i : i + batch_size]
+            for i in range(0, len(elevator_system_ids), batch_size)
+        ]
+        return sum(pool.map(self._move_batch, batches))
+
+    @staticmethod
+    def _move_batch(elevator_system_ids):
+        try:
+            elevator_moves = ElevatorLogic.move_elevators(
+                elevator_system_ids, skip_locked=True
+            )
+            return sum(
+                1
+                for elevator_move in elevator_moves
+                if elevator_move.reached_station is not None
+            )
+        finally:
+            connections.close_all()
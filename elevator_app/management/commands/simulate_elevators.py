@@ -0,0 +1,59 @@
+import json
+from django.core.management.base import BaseCommand, CommandError
+from elevator_app.elevator_logic import SCHEDULING_STRATEGIES
+from elevator_app.simulator import ElevatorSimulator, TRAFFIC_PATTERNS
+
+
+class Command(BaseCommand):
+    help = (
+        "Simulates an elevator system under synthetic traffic, in memory, and "
+        "prints the wait & journey times, moves per second and scheduler CPU "
+        "time per decision of every selected scheduling strategy as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--stations", type=int, default=100)
+        parser.add_argument("--hours", type=float, default=24.0)
+        parser.add_argument("--pattern", choices=TRAFFIC_PATTERNS, default="day")
+        parser.add_argument(
+            "--rate", type=float, default=4.0, help="Passenger arrivals per minute."
+        )
+        parser.add_argument(
+            "--strategy",
+            action="append",
+            help="Scheduling strategy to simulate, repeatable. Defaults to all.",
+        )
+        parser.add_argument("--floor-seconds", type=float, default=1.5)
+        parser.add_argument("--stop-seconds", type=float, default=8.0)
+        parser.add_argument(
+            "--skips-allowed",
+            type=int,
+            help="Defaults to the SKIPS_ALLOWED_PER_REQUEST setting.",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        strategies = options["strategy"] or list(SCHEDULING_STRATEGIES)
+        unknown_strategies = set(strategies) - set(SCHEDULING_STRATEGIES)
+        if unknown_strategies:
+            raise CommandError(
+                f"Unknown scheduling strategies: {', '.join(sorted(unknown_strategies))}."
+            )
+        results = []
+        for strategy in strategies:
+            try:
+                simulator = ElevatorSimulator(
+                    options["stations"],
+                    strategy=strategy,
+                    pattern=options["pattern"],
+                    arrivals_per_minute=options["rate"],
+                    duration_seconds=options["hours"] * 3600,
+                    floor_seconds=options["floor_seconds"],
+                    stop_seconds=options["stop_seconds"],
+                    skips_allowed=options["skips_allowed"],
+                    seed=options["seed"],
+                )
+            except ValueError as e:
+                raise CommandError(e)
+            results.append(simulator.run())
+        self.stdout.write(json.dumps(results, indent=2))
@@ -0,0 +1,93 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from elevator_app import event_log
+from elevator_app.models import ElevatorRequest, ElevatorStation, ElevatorSystem
+
+
+class Command(BaseCommand):
+    help = (
+        "Snapshots the replayed state of the elevator systems with new events in "
+        "the event log. Run it periodically, e.g. from cron. With --verify, also "
+        "checks the replayed states against the elevator system tables."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Elevator systems snapshotted together.",
+        )
+        parser.add_argument(
+            "--settle-seconds",
+            type=float,
+            default=event_log.SNAPSHOT_SETTLE_SECONDS,
+            help="Leave the events newer than this out of the snapshots.",
+        )
+        parser.add_argument(
+            "--verify",
+            action="store_true",
+            help="Fail if a replayed state differs from the tables.",
+        )
+
+    def handle(self, *args, **options):
+        elevator_system_ids = list(
+            ElevatorSystem.objects.values_list("id", flat=True).order_by("id")
+        )
+        batch_size = options["batch_size"]
+        settled_before = timezone.now() - timedelta(seconds=options["settle_seconds"])
+        snapshots_count, mismatched_ids = 0, []
+        for i in range(0, len(elevator_system_ids), batch_size):
+            batch_ids = elevator_system_ids[i : i + batch_size]
+            snapshots_count += event_log.take_snapshots(batch_ids, settled_before)
+            if options["verify"]:
+                mismatched_ids += self._verify(batch_ids)
+        self.stdout.write(f"Took {snapshots_count} snapshots.")
+        if mismatched_ids:
+            raise CommandError(
+                f"The replayed state of {len(mismatched_ids)} elevator systems "
+                f"differs from the tables: {mismatched_ids[:20]}"
+            )
+
+    @staticmethod
+    def _verify(elevator_system_ids):
+        states = {
+            elevator_system_id: event_log.initial_state()
+            for elevator_system_id in elevator_system_ids
+        }
+        for (
+            elevator_system_id,
+            curr_station_id,
+            curr_floor_no,
+            curr_direction,
+        ) in ElevatorSystem.objects.filter(pk__in=elevator_system_ids).values_list(
+            "id", "curr_station_id", "curr_station__floor_no", "curr_direction"
+        ):
+            states[elevator_system_id].update(
+                curr_station=curr_station_id,
+                curr_floor_no=curr_floor_no,
+                curr_direction=curr_direction,
+            )
+        for req_id, elevator_system_id in (
+            ElevatorRequest.objects.filter(
+                elevator_system__in=elevator_system_ids, served_on=None
+            )
+            .values_list("id", "elevator_system_id")
+            .order_by("id")
+        ):
+            states[elevator_system_id]["pending_req_ids"].append(req_id)
+        for station_id, elevator_system_id in (
+            ElevatorStation.objects.filter(elevator_system__in=elevator_system_ids)
+            .exclude(under_maintenance_since=None)
+            .values_list("id", "elevator_system_id")
+            .order_by("id")
+        ):
+            states[elevator_system_id]["maintenance_station_ids"].append(station_id)
+        return [
+            elevator_system_id
+            for elevator_system_id, state in event_log.get_states(
+                elevator_system_ids
+            ).items()
+            if state != states[elevator_system_id]
+        ]
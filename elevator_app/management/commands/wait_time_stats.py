@@ -0,0 +1,59 @@
+import json
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import DurationField, ExpressionWrapper, F
+from elevator_app.datetimes import parse_aware_datetime
+from elevator_app.models import ArchivedElevatorRequest, ElevatorRequest
+from elevator_app.stats import percentile
+
+
+class Command(BaseCommand):
+    help = (
+        "Prints the average & p50/p95/p99 wait times (created -> served_on, in "
+        "seconds) and skip counts of served elevator requests, archived ones "
+        "included, as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--elevator-system", type=int, help="Elevator system id.")
+        parser.add_argument(
+            "--since", help="Only requests created since this ISO 8601 datetime."
+        )
+
+    def handle(self, *args, **options):
+        since = None
+        if options["since"]:
+            since = parse_aware_datetime(options["since"])
+            if since is None:
+                raise CommandError("--since expects an ISO 8601 datetime.")
+        wait_seconds, skip_counts = [], []
+        # Served requests are in the hot table until archived.
+        for served_reqs in (
+            ElevatorRequest.objects.exclude(served_on=None),
+            ArchivedElevatorRequest.objects.all(),
+        ):
+            if options["elevator_system"]:
+                served_reqs = served_reqs.filter(
+                    elevator_system=options["elevator_system"]
+                )
+            if since:
+                served_reqs = served_reqs.filter(created__gte=since)
+            waits = served_reqs.annotate(
+                wait=ExpressionWrapper(
+                    F("served_on") - F("created"), output_field=DurationField()
+                )
+            ).values_list("wait", "skip_count")
+            for wait, skip_count in waits.iterator(chunk_size=10_000):
+                wait_seconds.append(wait.total_seconds())
+                skip_counts.append(skip_count)
+        wait_seconds.sort()
+        skip_counts.sort()
+        stats = {
+            "served_requests": len(wait_seconds),
+            "avg_wait": sum(wait_seconds) / len(wait_seconds) if wait_seconds else None,
+            "p50_wait": percentile(wait_seconds, 0.50),
+            "p95_wait": percentile(wait_seconds, 0.95),
+            "p99_wait": percentile(wait_seconds, 0.99),
+            "max_skip_count": skip_counts[-1] if skip_counts else None,
+            "p99_skip_count": percentile(skip_counts, 0.99),
+        }
+        self.stdout.write(json.dumps(stats, indent=2))
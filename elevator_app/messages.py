@@ -0,0 +1,33 @@
+"""
+Messages returned by the elevator operation APIs, shared by the sync & async views.
+"""
+
+NO_REQUESTS_TO_MOVE = "There are no requests to move the elevator, Use call or select elevators and try again!"
+ELEVATOR_MOVED = "Lift moved to floor #{floor_no} successfully!"
+STATIONS_COUNT_EXCEEDED = (
+    "This Elevator System has only {stations_count} stations/floors."
+)
+ALREADY_ON_CALLED_FLOOR = "Elevator is already on the floor #{floor_no}! You can select the destionation floor now!"
+CALLED_STATION_UNDER_MAINTENANCE = (
+    "Sorry! This floor #{floor_no} elevator station is under maintenance!"
+)
+CALL_SAVED = "Elevator call request Saved! Elevator will reach this floor shortly!"
+CALL_MERGED = "Elevator is already called to the floor #{floor_no}! Your call is merged with the pending one."
+CALL_ASSIGNED = "Elevator call request Saved! Elevator System #{elevator_system_id} will reach this floor shortly!"
+NO_CAR_AVAILABLE = (
+    "Sorry! No elevator of this bank can serve the floor #{floor_no} right now!"
+)
+SELECTED_STATION_UNDER_MAINTENANCE = "The selected floor #{floor_no} station is under maintenance! Please select a different floor!"
+ALREADY_ON_SELECTED_FLOOR = (
+    "Elevator is already on the floor #{floor_no}! Please select a different floor!"
+)
+SELECT_SAVED = (
+    "Select Floor request Saved! Elevator will reach the selected floor shortly!"
+)
+MAINTENANCE_TOGGLED = "Station at floor #{floor_no} is {marked} under maintenance!"
+UNKNOWN_SCHEDULING_STRATEGY = (
+    "Unknown scheduling strategy {strategy!r}, choose one of {strategies}."
+)
+SCHEDULING_STRATEGY_SET = "Elevator System now schedules its stops with {strategy}!"
+ELEVATOR_SYSTEM_NOT_FOUND = "Elevator System #{elevator_system_id} does not exist!"
+EVENTS_SAVED = "{saved_count} of {events_count} button presses saved!"
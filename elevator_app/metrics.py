@@ -0,0 +1,146 @@
+import bisect
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+SECONDS_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+)
+COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+# Seconds spent per section (scheduler, serializer) by the request being handled.
+request_sections = contextvars.ContextVar("request_sections", default=None)
+
+
+def escape_label_value(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        i = bisect.bisect_left(self.buckets, value)
+        if i < len(self.counts):
+            self.counts[i] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """
+    In-process histograms, labelled per view, rendered in the Prometheus text
+    format. Each process (worker) exposes its own.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+
+    def register(self, name, help_text, buckets):
+        self._metrics[name] = (help_text, buckets, {})
+
+    def observe(self, name, labels, value):
+        _, buckets, histograms = self._metrics[name]
+        labels = tuple(sorted(labels.items()))
+        with self._lock:
+            histogram = histograms.get(labels)
+            if histogram is None:
+                histogram = histograms[labels] = Histogram(buckets)
+            histogram.observe(value)
+
+    @staticmethod
+    def _format_labels(labels, **extra):
+        return ",".join(
+            f'{key}="{escape_label_value(value)}"'
+            for key, value in (*labels, *extra.items())
+        )
+
+    def render(self):
+        lines = []
+        with self._lock:
+            for name, (help_text, buckets, histograms) in self._metrics.items():
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} histogram")
+                for labels, histogram in histograms.items():
+                    cumulative = 0
+                    for bound, count in zip(buckets, histogram.counts):
+                        cumulative += count
+                        lines.append(
+                            f"{name}_bucket{{{self._format_labels(labels, le=bound)}}} {cumulative}"
+                        )
+                    lines.append(
+                        f'{name}_bucket{{{self._format_labels(labels, le="+Inf")}}} {histogram.count}'
+                    )
+                    lines.append(
+                        f"{name}_sum{{{self._format_labels(labels)}}} {histogram.sum}"
+                    )
+                    lines.append(
+                        f"{name}_count{{{self._format_labels(labels)}}} {histogram.count}"
+                    )
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+registry.register(
+    "elevator_app_request_seconds", "Wall time of the requests.", SECONDS_BUCKETS
+)
+registry.register(
+    "elevator_app_db_queries", "Database queries run per request.", COUNT_BUCKETS
+)
+registry.register(
+    "elevator_app_db_seconds",
+    "Time spent in database queries per request.",
+    SECONDS_BUCKETS,
+)
+registry.register(
+    "elevator_app_section_seconds",
+    "Time spent per request in the scheduler & the serializers, which may overlap.",
+    SECONDS_BUCKETS,
+)
+
+
+@contextmanager
+def timed(section):
+    """
+    Adds the time spent in the block to the `section` total of the current request,
+    if any. Nested blocks of the same section are only counted once.
+    """
+    sections = request_sections.get()
+    if sections is None or section in sections.running:
+        yield
+        return
+    sections.running.add(section)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        sections.running.discard(section)
+        sections[section] = sections.get(section, 0.0) + time.perf_counter() - started
+
+
+class RequestSections(dict):
+    __slots__ = ("running",)
+
+    def __init__(self):
+        super().__init__()
+        self.running = set()
@@ -0,0 +1,182 @@
+import contextlib
+import contextvars
+import logging
+import time
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from .metrics import registry, request_sections, RequestSections
+
+slow_request_logger = logging.getLogger("elevator_app.slow_requests")
+
+request_queries = contextvars.ContextVar("request_queries", default=None)
+
+
+class QueryRecorder:
+    """
+    Counts & times the queries of a request, and keeps their SQL when the slow
+    request log is on. See `record_query`.
+    """
+
+    def __init__(self, keep_sql):
+        self.count = 0
+        self.seconds = 0.0
+        self.sql = [] if keep_sql else None
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - started
+            self.count += 1
+            if self.sql is not None:
+                self.sql.append(sql)
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    Execute wrapper of every connection, see `install_query_recorder`, handing
+    the query to the `QueryRecorder` of the current request, if any. The request
+    is found through a context variable, which follows it into the worker
+    threads running sync views & `sync_to_async` calls under ASGI.
+    """
+    recorder = request_queries.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    return recorder(execute, sql, params, many, context)
+
+
+def install_query_recorder(connection, **kwargs):
+    """
+    `connection_created` receiver adding `record_query` to the connection. It
+    goes first, as `connection.execute_wrapper()` pops the last wrapper on exit.
+    """
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, record_query)
+
+
+@contextlib.contextmanager
+def recording(sections, recorder):
+    sections_token = request_sections.set(sections)
+    queries_token = request_queries.set(recorder)
+    try:
+        yield
+    finally:
+        request_queries.reset(queries_token)
+        request_sections.reset(sections_token)
+
+
+class MetricsMiddleware:
+    """
+    Records the wall time, DB query count & DB time, scheduler & serializer time
+    of every request into `metrics.registry`, labelled by URL name & method.
+    Queries are recorded whichever thread runs them, see `record_query`.
+    Streaming responses are recorded once fully sent, including the queries &
+    sections run while iterating them. Requests slower than
+    `METRICS_SLOW_REQUEST_SECONDS`, if set, are logged with their SQL.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.slow_request_seconds = settings.METRICS_SLOW_REQUEST_SECONDS
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        recorder = QueryRecorder(keep_sql=self.slow_request_seconds is not None)
+        sections = RequestSections()
+        started = time.perf_counter()
+        with recording(sections, recorder):
+            response = self.get_response(request)
+        return self.finish(request, response, started, sections, recorder)
+
+    async def __acall__(self, request):
+        recorder = QueryRecorder(keep_sql=self.slow_request_seconds is not None)
+        sections = RequestSections()
+        started = time.perf_counter()
+        with recording(sections, recorder):
+            response = await self.get_response(request)
+        return self.finish(request, response, started, sections, recorder)
+
+    def finish(self, request, response, started, sections, recorder):
+        if not response.streaming:
+            self.record(
+                request, response, time.perf_counter() - started, sections, recorder
+            )
+            return response
+
+        def record():
+            self.record(
+                request, response, time.perf_counter() - started, sections, recorder
+            )
+
+        if response.is_async:
+            response.streaming_content = self.arecord_stream(
+                response.streaming_content, sections, recorder, record
+            )
+        else:
+            response.streaming_content = self.record_stream(
+                response.streaming_content, sections, recorder, record
+            )
+        return response
+
+    @staticmethod
+    def record_stream(streaming_content, sections, recorder, record):
+        iterator = iter(streaming_content)
+        try:
+            while True:
+                with recording(sections, recorder):
+                    chunk = next(iterator, None)
+                if chunk is None:
+                    break
+                yield chunk
+        finally:
+            record()
+
+    @staticmethod
+    async def arecord_stream(streaming_content, sections, recorder, record):
+        iterator = aiter(streaming_content)
+        try:
+            while True:
+                with recording(sections, recorder):
+                    chunk = await anext(iterator, None)
+                if chunk is None:
+                    break
+                yield chunk
+        finally:
+            record()
+
+    def record(self, request, response, seconds, sections, recorder):
+        resolver_match = request.resolver_match
+        labels = {
+            "view": resolver_match.url_name if resolver_match else "unresolved",
+            "method": request.method,
+        }
+        registry.observe("elevator_app_request_seconds", labels, seconds)
+        registry.observe("elevator_app_db_queries", labels, recorder.count)
+        registry.observe("elevator_app_db_seconds", labels, recorder.seconds)
+        for section, section_seconds in sections.items():
+            registry.observe(
+                "elevator_app_section_seconds",
+                {**labels, "section": section},
+                section_seconds,
+            )
+        if (
+            self.slow_request_seconds is not None
+            and seconds >= self.slow_request_seconds
+        ):
+            slow_request_logger.warning(
+                "Slow request %s %s: %.1f ms, status %s, %s queries in %.1f ms%s",
+                request.method,
+                request.get_full_path(),
+                seconds * 1000,
+                response.status_code,
+                recorder.count,
+                recorder.seconds * 1000,
+                "".join(f"\n  {sql}" for sql in recorder.sql),
+            )
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.3 on 2026-10-18 20:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("elevator_app", "0007_alter_elevatorrequest_to_station"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="elevatorrequest",
+            index=models.Index(
+                condition=models.Q(("served_on", None)),
+                fields=["elevator_system"],
+                name="elevator_request_pending_idx",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="elevatorstation",
+            constraint=models.UniqueConstraint(
+                fields=("elevator_system", "floor_no"),
+                name="unique_elevator_station_floor_no",
+            ),
+        ),
+    ]
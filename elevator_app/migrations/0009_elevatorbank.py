@@ -0,0 +1,48 @@
+# Generated by Django 4.2.3 on 2026-10-18 20:27
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("elevator_app", "0008_pending_request_and_station_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ElevatorBank",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created", models.DateTimeField(auto_now_add=True)),
+                ("updated", models.DateTimeField(auto_now=True)),
+                ("stations_count", models.PositiveIntegerField()),
+                (
+                    "building_name",
+                    models.CharField(default="Name Unkown", max_length=100),
+                ),
+            ],
+            options={
+                "abstract": False,
+            },
+        ),
+        migrations.AddField(
+            model_name="elevatorsystem",
+            name="bank",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="cars",
+                to="elevator_app.elevatorbank",
+            ),
+        ),
+    ]
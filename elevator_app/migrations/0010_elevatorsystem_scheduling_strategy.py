@@ -0,0 +1,17 @@
+# Generated by Django 4.2.3 on 2026-10-18 20:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("elevator_app", "0009_elevatorbank"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="elevatorsystem",
+            name="scheduling_strategy",
+            field=models.CharField(default="LOOK", max_length=50),
+        ),
+    ]
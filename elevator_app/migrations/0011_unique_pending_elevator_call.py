@@ -0,0 +1,35 @@
+# Generated by Django 4.2.3 on 2026-10-18 20:38
+
+from django.db import migrations, models
+
+
+def delete_duplicate_pending_calls(apps, schema_editor):
+    """
+    Keeps the oldest of the pending calls from each station.
+    """
+    ElevatorRequest = apps.get_model("elevator_app", "ElevatorRequest")
+    pending_calls = ElevatorRequest.objects.filter(to_station=None, served_on=None)
+    first_call_ids = (
+        pending_calls.values("from_station")
+        .annotate(first_call_id=models.Min("id"))
+        .values("first_call_id")
+    )
+    pending_calls.exclude(id__in=first_call_ids).delete()
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("elevator_app", "0010_elevatorsystem_scheduling_strategy"),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_duplicate_pending_calls, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="elevatorrequest",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("served_on", None), ("to_station", None)),
+                fields=("from_station",),
+                name="unique_pending_elevator_call",
+            ),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.3 on 2026-10-18 20:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("elevator_app", "0011_unique_pending_elevator_call"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="elevatorsystem",
+            name="stations_updated",
+            field=models.DateTimeField(blank=True, default=None, null=True),
+        ),
+    ]
@@ -0,0 +1,134 @@
+# Generated by Django 4.2.3 on 2026-10-18 20:47
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+def snapshot_elevator_systems(apps, schema_editor):
+    """
+    Starts the replay of the existing elevator systems from their current state.
+    """
+    ElevatorSystem = apps.get_model("elevator_app", "ElevatorSystem")
+    ElevatorStation = apps.get_model("elevator_app", "ElevatorStation")
+    ElevatorRequest = apps.get_model("elevator_app", "ElevatorRequest")
+    ElevatorSystemSnapshot = apps.get_model("elevator_app", "ElevatorSystemSnapshot")
+    pending_req_ids, maintenance_station_ids = {}, {}
+    for req_id, elevator_system_id in ElevatorRequest.objects.filter(
+        served_on=None
+    ).values_list("id", "elevator_system_id"):
+        pending_req_ids.setdefault(elevator_system_id, []).append(req_id)
+    for station_id, elevator_system_id in ElevatorStation.objects.exclude(
+        under_maintenance_since=None
+    ).values_list("id", "elevator_system_id"):
+        maintenance_station_ids.setdefault(elevator_system_id, []).append(station_id)
+    ElevatorSystemSnapshot.objects.bulk_create(
+        ElevatorSystemSnapshot(
+            elevator_system_id=elevator_system_id,
+            last_event_id=0,
+            state={
+                "curr_station": curr_station_id,
+                "curr_floor_no": curr_floor_no,
+                "curr_direction": curr_direction,
+                "pending_req_ids": sorted(pending_req_ids.get(elevator_system_id, [])),
+                "maintenance_station_ids": sorted(
+                    maintenance_station_ids.get(elevator_system_id, [])
+                ),
+            },
+        )
+        for elevator_system_id, curr_station_id, curr_floor_no, curr_direction in (
+            ElevatorSystem.objects.values_list(
+                "id", "curr_station_id", "curr_station__floor_no", "curr_direction"
+            )
+        )
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("elevator_app", "0012_elevatorsystem_stations_updated"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ElevatorSystemSnapshot",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("last_event_id", models.PositiveBigIntegerField()),
+                ("state", models.JSONField()),
+                ("created", models.DateTimeField(auto_now_add=True)),
+                (
+                    "elevator_system",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="elevator_app.elevatorsystem",
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="ElevatorEvent",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("INITIATE", "INITIATE"),
+                            ("CALL", "CALL"),
+                            ("SELECT", "SELECT"),
+                            ("MOVE", "MOVE"),
+                            ("SERVE", "SERVE"),
+                            ("MAINTENANCE", "MAINTENANCE"),
+                        ],
+                        max_length=50,
+                    ),
+                ),
+                ("created", models.DateTimeField(default=django.utils.timezone.now)),
+                ("floor_no", models.PositiveIntegerField(blank=True, null=True)),
+                ("data", models.JSONField(blank=True, default=dict)),
+                (
+                    "elevator_system",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="elevator_app.elevatorsystem",
+                    ),
+                ),
+                (
+                    "station",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="elevator_app.elevatorstation",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["elevator_system", "id"],
+                        name="elevator_event_replay_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(snapshot_elevator_systems, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 4.2.3 on 2026-10-18 20:49
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("elevator_app", "0013_event_log"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedElevatorRequest",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("served_on", models.DateTimeField()),
+                ("skip_count", models.PositiveIntegerField(default=0)),
+                ("created", models.DateTimeField()),
+                ("updated", models.DateTimeField()),
+                (
+                    "archived_on",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+                (
+                    "elevator_system",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="elevator_app.elevatorsystem",
+                    ),
+                ),
+                (
+                    "from_station",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="elevator_app.elevatorstation",
+                    ),
+                ),
+                (
+                    "to_station",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="elevator_app.elevatorstation",
+                    ),
+                ),
+            ],
+        ),
+    ]
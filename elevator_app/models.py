@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 import enum
 
 
@@ -20,6 +21,16 @@ class TimeStampBaseModel(models.Model):
         abstract = True
 
 
+class ElevatorBank(TimeStampBaseModel):
+    """
+    A bank of elevators (each an `ElevatorSystem`) serving the same floors and
+    sharing the hall calls made from them.
+    """
+
+    stations_count = models.PositiveIntegerField()
+    building_name = models.CharField(max_length=100, default="Name Unkown")
+
+
 class ElevatorSystem(TimeStampBaseModel):
     stations_count = models.PositiveIntegerField()
     curr_station = models.ForeignKey(
@@ -29,15 +40,20 @@ class ElevatorSystem(TimeStampBaseModel):
         max_length=50, choices=Directions.choices(), default=Directions.UP
     )
     building_name = models.CharField(max_length=100, default="Name Unkown")
+    # Bumped whenever a station changes, see `station_cache.StationCache`.
+    stations_updated = models.DateTimeField(default=None, blank=True, null=True)
+    # Name of a strategy registered in `elevator_logic.SCHEDULING_STRATEGIES`.
+    scheduling_strategy = models.CharField(max_length=50, default="LOOK")
+    bank = models.ForeignKey(
+        ElevatorBank,
+        on_delete=models.CASCADE,
+        related_name="cars",
+        null=True,
+        blank=True,
+    )
 
     def get_pending_requests(self):
-        nearest_floor_no_case = models.Case(
-            models.When(to_station=None, then="from_station__under_maintenance_since"),
-            default="to_station__under_maintenance_since",
-        )
-        return ElevatorRequest.objects.annotate(
-            nearest_floor_um=nearest_floor_no_case
-        ).filter(elevator_system=self, served_on=None, nearest_floor_um=None)
+        return ElevatorRequest.objects.pending().filter(elevator_system=self)
 
 
 class ElevatorStation(TimeStampBaseModel):
@@ -45,6 +61,28 @@ class ElevatorStation(TimeStampBaseModel):
     floor_no = models.PositiveIntegerField()
     under_maintenance_since = models.DateTimeField(default=None, blank=True, null=True)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=("elevator_system", "floor_no"),
+                name="unique_elevator_station_floor_no",
+            ),
+        ]
+
+
+class ElevatorRequestQuerySet(models.QuerySet):
+    def pending(self):
+        """
+        Requests yet to be served, excluding the ones to under maintenance stations.
+        """
+        nearest_floor_no_case = models.Case(
+            models.When(to_station=None, then="from_station__under_maintenance_since"),
+            default="to_station__under_maintenance_since",
+        )
+        return self.annotate(nearest_floor_um=nearest_floor_no_case).filter(
+            served_on=None, nearest_floor_um=None
+        )
+
 
 class ElevatorRequest(TimeStampBaseModel):
     elevator_system = models.ForeignKey(ElevatorSystem, on_delete=models.CASCADE)
@@ -61,6 +99,103 @@ class ElevatorRequest(TimeStampBaseModel):
     served_on = models.DateTimeField(blank=True, null=True, default=None)
     skip_count = models.PositiveIntegerField(default=0)
 
+    objects = ElevatorRequestQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=("elevator_system",),
+                condition=models.Q(served_on=None),
+                name="elevator_request_pending_idx",
+            ),
+        ]
+        constraints = [
+            # One pending call per station, repeated presses are merged into it.
+            models.UniqueConstraint(
+                fields=("from_station",),
+                condition=models.Q(to_station=None, served_on=None),
+                name="unique_pending_elevator_call",
+            ),
+        ]
+
     def record_skipped(self, *args, **kwargs):
         self.skip_count = self.skip_count + 1
         self.save()
+
+
+class ArchivedElevatorRequest(models.Model):
+    """
+    A served `ElevatorRequest` moved out of the hot table by the archiver, see
+    `archiver.archive_served_requests`. Keeps the id & the stamps of the request.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    elevator_system = models.ForeignKey(ElevatorSystem, on_delete=models.CASCADE)
+    from_station = models.ForeignKey(
+        ElevatorStation, on_delete=models.CASCADE, related_name="+"
+    )
+    to_station = models.ForeignKey(
+        ElevatorStation,
+        on_delete=models.CASCADE,
+        related_name="+",
+        null=True,
+        blank=True,
+    )
+    served_on = models.DateTimeField()
+    skip_count = models.PositiveIntegerField(default=0)
+    created = models.DateTimeField()
+    updated = models.DateTimeField()
+    archived_on = models.DateTimeField(default=timezone.now)
+
+
+@enum.unique
+class EventKinds(str, enum.Enum):
+    INITIATE = "INITIATE"
+    CALL = "CALL"
+    SELECT = "SELECT"
+    MOVE = "MOVE"
+    SERVE = "SERVE"
+    MAINTENANCE = "MAINTENANCE"
+
+    @classmethod
+    def choices(cls):
+        return [(item.value, item.name) for item in cls]
+
+
+class ElevatorEvent(models.Model):
+    """
+    Append-only log of the state changes of elevator systems, see `event_log`.
+    Rows are never updated.
+    """
+
+    elevator_system = models.ForeignKey(ElevatorSystem, on_delete=models.CASCADE)
+    kind = models.CharField(max_length=50, choices=EventKinds.choices())
+    created = models.DateTimeField(default=timezone.now)
+    station = models.ForeignKey(
+        ElevatorStation,
+        on_delete=models.CASCADE,
+        related_name="+",
+        null=True,
+        blank=True,
+    )
+    floor_no = models.PositiveIntegerField(null=True, blank=True)
+    # Kind specific details, e.g. the served request ids of a SERVE event.
+    data = models.JSONField(default=dict, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=("elevator_system", "id"), name="elevator_event_replay_idx"
+            ),
+        ]
+
+
+class ElevatorSystemSnapshot(models.Model):
+    """
+    The replayed state of an elevator system up to & including `last_event_id`.
+    """
+
+    elevator_system = models.ForeignKey(ElevatorSystem, on_delete=models.CASCADE)
+    last_event_id = models.PositiveBigIntegerField()
+    state = models.JSONField()
+    created = models.DateTimeField(auto_now_add=True)
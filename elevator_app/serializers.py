@@ -1,8 +1,12 @@
-from django.urls import reverse
+import functools
+from django.urls import get_script_prefix, reverse
 from django.db.models import Q
+from django.utils import timezone
 from rest_framework import serializers
-from .models import ElevatorSystem, ElevatorRequest, ElevatorStation
-from .elevator_logic import ElevatorLogic
+from rest_framework.settings import api_settings
+from .models import ElevatorBank, ElevatorSystem, ElevatorRequest, ElevatorStation
+from .elevator_logic import ElevatorLogic, SCHEDULING_STRATEGIES
+from . import messages, metrics
 
 ExtraElevatorReqFields = ("destination", "url")
 
@@ -10,11 +14,23 @@ ElevatorSytemFields = (
     "id",
     "building_name",
     "stations_count",
+    "scheduling_strategy",
     "created",
 )
 
 
-class ElevatorStationSerializer(serializers.ModelSerializer):
+class TimedSerializerMixin:
+    """
+    Counts the time spent serializing in the `serializer` section of the request
+    metrics, see `metrics.timed`.
+    """
+
+    def to_representation(self, instance):
+        with metrics.timed("serializer"):
+            return super().to_representation(instance)
+
+
+class ElevatorStationSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     url = serializers.SerializerMethodField()
 
     def get_url(self, obj):
@@ -25,7 +41,9 @@ class ElevatorStationSerializer(serializers.ModelSerializer):
         fields = ("id", "floor_no", "url")
 
 
-class ElevatorStationDetailSerializer(serializers.ModelSerializer):
+class ElevatorStationDetailSerializer(
+    TimedSerializerMixin, serializers.ModelSerializer
+):
     class Meta:
         model = ElevatorStation
         fields = ("id", "floor_no", "under_maintenance_since")
@@ -37,7 +55,9 @@ def deduce_destination(elevator_req):
     return elevator_req.from_station
 
 
-class BaseElevatorRequestModelSerializer(serializers.ModelSerializer):
+class BaseElevatorRequestModelSerializer(
+    TimedSerializerMixin, serializers.ModelSerializer
+):
     """
     This serializers returns the important stuff of elevator request
     """
@@ -93,13 +113,22 @@ class PendingRequestSerializer(BaseElevatorRequestModelSerializer):
         fields = ("id", "skip_count", "destination", "from_station", "to_station")
 
 
-class BaseElevatorSystemSerializer(serializers.ModelSerializer):
+class BaseElevatorSystemSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     curr_station = ElevatorStationSerializer(read_only=True)
     url = serializers.SerializerMethodField()
 
     def get_url(self, obj):
         return reverse("elevator_system", kwargs={"pk": obj.id})
 
+    def validate_scheduling_strategy(self, value):
+        if value not in SCHEDULING_STRATEGIES:
+            raise serializers.ValidationError(
+                messages.UNKNOWN_SCHEDULING_STRATEGY.format(
+                    strategy=value, strategies=", ".join(SCHEDULING_STRATEGIES)
+                )
+            )
+        return value
+
 
 class MiniElevatorSystemSerializer(BaseElevatorSystemSerializer):
     """
@@ -114,33 +143,27 @@ class MiniElevatorSystemSerializer(BaseElevatorSystemSerializer):
         fields = (*ElevatorSytemFields, "url")
 
 
-class ElevatorSystemIntanceSerializer(BaseElevatorSystemSerializer):
+class ElevatorSystemStateSerializer(BaseElevatorSystemSerializer):
     """
-    A simple serializer for `ElevatorSystem` model.
-    Also adds requests into the result payload.
+    A serializer for the live state of an `ElevatorSystem`.
+    Its size does not grow with the request history, use it for PATCH responses.
     """
 
-    all_requests = MiniElevatorRequestSerializer(
-        source="elevatorrequest_set", many=True, read_only=True
-    )
-
     nextstation = serializers.SerializerMethodField()
     pendingrequests = serializers.SerializerMethodField()
     undermaintenancestations = serializers.SerializerMethodField()
 
     def get_nextstation(self, obj):
-        next_stop, direction = ElevatorLogic.get_next_request(obj)
-        obj.curr_direction = direction
-        obj.save()
+        next_stop, _ = ElevatorLogic.get_next_stop(obj)
         if next_stop is None:
             return "To Be Decided"
-        next_station = (
-            next_stop.to_station if next_stop.to_station else next_stop.from_station
-        )
-        return next_station.floor_no
+        return next_stop.floor_no
 
     def get_pendingrequests(self, obj):
-        return PendingRequestSerializer(obj.get_pending_requests(), many=True).data
+        pending_reqs = obj.get_pending_requests().select_related(
+            "from_station", "to_station"
+        )
+        return PendingRequestSerializer(pending_reqs, many=True).data
 
     def get_undermaintenancestations(self, obj):
         stations_under_maintenance = (
@@ -164,5 +187,159 @@ class ElevatorSystemIntanceSerializer(BaseElevatorSystemSerializer):
             "undermaintenancestations",
             "pendingrequests",
             "updated",
-            "all_requests",
         )
+
+
+@functools.lru_cache(maxsize=None)
+def _url_template(url_name, script_prefix):
+    return reverse(url_name, kwargs={"pk": URL_PK_PLACEHOLDER}).replace(
+        str(URL_PK_PLACEHOLDER), "{pk}"
+    )
+
+
+URL_PK_PLACEHOLDER = 987654321
+
+
+def url_template(url_name):
+    """
+    `reverse(url_name, kwargs={"pk": pk})` as a `str.format` template of `pk`,
+    reversed once per script prefix.
+    """
+    return _url_template(url_name, get_script_prefix())
+
+
+class FastElevatorSystemStateSerializer:
+    """
+    Same output as `ElevatorSystemStateSerializer`, built as plain dicts out of
+    `values()` rows, with precomputed URL templates & datetime format instead of
+    DRF fields & a `reverse()` per URL. Used for the PATCH responses.
+    """
+
+    def __init__(self, instance):
+        self.instance = instance
+
+    @staticmethod
+    def _format_datetime(value):
+        return timezone.localtime(value).strftime(api_settings.DATETIME_FORMAT)
+
+    @staticmethod
+    def _station(station_id, floor_no, station_url):
+        if station_id is None:
+            return None
+        return {
+            "id": station_id,
+            "floor_no": floor_no,
+            "url": station_url.format(pk=station_id),
+        }
+
+    @property
+    def data(self):
+        with metrics.timed("serializer"):
+            return self.to_representation(self.instance)
+
+    def to_representation(self, obj):
+        station_url = url_template("elevator_station")
+        next_stop, _ = ElevatorLogic.get_next_stop(obj)
+        curr_station = obj.curr_station
+        pending_reqs = [
+            {
+                "id": req_id,
+                "skip_count": skip_count,
+                "destination": from_floor_no if to_station_id is None else to_floor_no,
+                "from_station": self._station(
+                    from_station_id, from_floor_no, station_url
+                ),
+                "to_station": self._station(to_station_id, to_floor_no, station_url),
+            }
+            for (
+                req_id,
+                skip_count,
+                from_station_id,
+                from_floor_no,
+                to_station_id,
+                to_floor_no,
+            ) in obj.get_pending_requests().values_list(
+                "id",
+                "skip_count",
+                "from_station_id",
+                "from_station__floor_no",
+                "to_station_id",
+                "to_station__floor_no",
+            )
+        ]
+        return {
+            "id": obj.id,
+            "building_name": obj.building_name,
+            "stations_count": obj.stations_count,
+            "scheduling_strategy": obj.scheduling_strategy,
+            "created": self._format_datetime(obj.created),
+            "curr_station": (
+                self._station(curr_station.id, curr_station.floor_no, station_url)
+                if curr_station
+                else None
+            ),
+            "curr_direction": obj.curr_direction,
+            "nextstation": "To Be Decided" if next_stop is None else next_stop.floor_no,
+            "undermaintenancestations": list(
+                ElevatorStation.objects.filter(
+                    ~Q(under_maintenance_since=None), elevator_system=obj
+                ).values_list("floor_no", flat=True)
+            ),
+            "pendingrequests": pending_reqs,
+            "updated": self._format_datetime(obj.updated),
+        }
+
+
+class ElevatorSystemIntanceSerializer(ElevatorSystemStateSerializer):
+    """
+    A simple serializer for `ElevatorSystem` model.
+    Also adds requests into the result payload.
+    """
+
+    all_requests = serializers.SerializerMethodField()
+
+    def get_all_requests(self, obj):
+        elevator_reqs = obj.elevatorrequest_set.select_related(
+            "from_station", "to_station"
+        )
+        return MiniElevatorRequestSerializer(elevator_reqs, many=True).data
+
+    class Meta(ElevatorSystemStateSerializer.Meta):
+        fields = (*ElevatorSystemStateSerializer.Meta.fields, "all_requests")
+
+
+class ElevatorBankSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    """
+    A serializer for `ElevatorBank` model, lists the bank's cars.
+    Also used for new elevator bank initiation.
+    """
+
+    cars_count = serializers.IntegerField(write_only=True, min_value=1)
+    cars = MiniElevatorSystemSerializer(many=True, read_only=True)
+    url = serializers.SerializerMethodField()
+
+    def get_url(self, obj):
+        return reverse("elevator_bank", kwargs={"pk": obj.id})
+
+    class Meta:
+        model = ElevatorBank
+        fields = (
+            "id",
+            "building_name",
+            "stations_count",
+            "cars_count",
+            "created",
+            "cars",
+            "url",
+        )
+
+
+class ElevatorEventSerializer(serializers.Serializer):
+    """
+    A button press: a `call` from a floor's station or a `select` of the
+    destination floor from within the elevator.
+    """
+
+    elevator_system = serializers.IntegerField()
+    type = serializers.ChoiceField(choices=("call", "select"))
+    floor_no = serializers.IntegerField()
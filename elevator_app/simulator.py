@@ -0,0 +1,187 @@
+import random
+import time
+from django.conf import settings
+from .elevator_logic import PendingFloorIndex, get_scheduling_strategy, is_skipped
+from .models import Directions, ElevatorSystem
+from .stats import summarize
+
+TRAFFIC_PATTERNS = ("up-peak", "down-peak", "inter-floor", "day")
+
+
+class SimPassenger:
+    __slots__ = ("arrived_at", "from_floor_no", "to_floor_no")
+
+    def __init__(self, arrived_at, from_floor_no, to_floor_no):
+        self.arrived_at = arrived_at
+        self.from_floor_no = from_floor_no
+        self.to_floor_no = to_floor_no
+
+
+class SimRequest:
+    """
+    In-memory stand-in of a pending `ElevatorRequest`, to `floor_no`.
+    Calls are made from `floor_no`, selects once `passenger` boarded.
+    """
+
+    __slots__ = ("id", "floor_no", "passenger", "is_select", "skip_count")
+
+    def __init__(self, req_id, floor_no, passenger, is_select):
+        self.id = req_id
+        self.floor_no = floor_no
+        self.passenger = passenger
+        self.is_select = is_select
+        self.skip_count = 0
+
+
+class ElevatorSimulator:
+    """
+    Discrete-event simulation of one elevator system under Poisson arrivals,
+    scheduled by the same `PendingFloorIndex` & `SchedulingStrategy` code as
+    `ElevatorLogic`, with the pending requests kept in memory instead of the
+    database. Every passenger calls the elevator from their floor and selects
+    their destination once aboard, the car has no capacity limit.
+
+    Traffic patterns: `up-peak` (lobby to upper floors), `down-peak` (upper
+    floors to lobby), `inter-floor` (between any floors) and `day`, which is
+    up-peak 07-10h, down-peak 16-19h and inter-floor otherwise.
+    """
+
+    def __init__(
+        self,
+        stations_count,
+        strategy="LOOK",
+        pattern="inter-floor",
+        arrivals_per_minute=4.0,
+        duration_seconds=24 * 3600,
+        floor_seconds=1.5,
+        stop_seconds=8.0,
+        skips_allowed=None,
+        seed=0,
+    ):
+        if stations_count < 2:
+            raise ValueError("The simulation needs at least 2 stations.")
+        if pattern not in TRAFFIC_PATTERNS:
+            raise ValueError(f"Unknown traffic pattern {pattern!r}.")
+        self.elevator_system = ElevatorSystem(
+            stations_count=stations_count, scheduling_strategy=strategy
+        )
+        self.strategy = get_scheduling_strategy(strategy)
+        self.pattern = pattern
+        self.arrivals_per_minute = arrivals_per_minute
+        self.duration_seconds = duration_seconds
+        self.floor_seconds = floor_seconds
+        self.stop_seconds = stop_seconds
+        self.skips_allowed = (
+            settings.SKIPS_ALLOWED_PER_REQ if skips_allowed is None else skips_allowed
+        )
+        self.rng = random.Random(seed)
+
+    def _pattern_at(self, at):
+        if self.pattern != "day":
+            return self.pattern
+        hour = at // 3600 % 24
+        if 7 <= hour < 10:
+            return "up-peak"
+        if 16 <= hour < 19:
+            return "down-peak"
+        return "inter-floor"
+
+    def _arrivals(self):
+        rate = self.arrivals_per_minute / 60
+        top_floor_no = self.elevator_system.stations_count
+        at = self.rng.expovariate(rate)
+        while at < self.duration_seconds:
+            pattern = self._pattern_at(at)
+            if pattern == "up-peak":
+                from_floor_no, to_floor_no = 1, self.rng.randint(2, top_floor_no)
+            elif pattern == "down-peak":
+                from_floor_no, to_floor_no = self.rng.randint(2, top_floor_no), 1
+            else:
+                from_floor_no, to_floor_no = self.rng.sample(
+                    range(1, top_floor_no + 1), 2
+                )
+            yield SimPassenger(at, from_floor_no, to_floor_no)
+            at += self.rng.expovariate(rate)
+
+    def run(self):
+        pending = {}
+        req_ids = iter(range(1, 1 << 62))
+        waits, journeys, decision_ns = [], [], []
+        moves_count = floors_travelled = 0
+        floor_no, direction, now = 1, Directions.UP, 0.0
+
+        def add_request(floor_no, passenger, is_select):
+            pending.setdefault(floor_no, []).append(
+                SimRequest(next(req_ids), floor_no, passenger, is_select)
+            )
+
+        def serve(floor_no, at):
+            for req in pending.pop(floor_no, ()):
+                if req.is_select:
+                    journeys.append(at - req.passenger.arrived_at)
+                else:
+                    waits.append(at - req.passenger.arrived_at)
+                    add_request(req.passenger.to_floor_no, req.passenger, True)
+
+        arrivals = self._arrivals()
+        next_passenger = next(arrivals, None)
+        started = time.perf_counter()
+        while pending or next_passenger is not None:
+            if not pending:
+                now = max(now, next_passenger.arrived_at)
+            while next_passenger is not None and next_passenger.arrived_at <= now:
+                add_request(next_passenger.from_floor_no, next_passenger, False)
+                next_passenger = next(arrivals, None)
+            if floor_no in pending:
+                serve(floor_no, now)
+                now += self.stop_seconds
+                continue
+
+            decision_started = time.process_time_ns()
+            index = PendingFloorIndex()
+            for target_floor_no, reqs in pending.items():
+                for req in reqs:
+                    index.add(
+                        target_floor_no,
+                        target_floor_no,
+                        promoted=req.skip_count > self.skips_allowed,
+                        req_id=req.id,
+                    )
+            prev_direction = direction
+            next_stop, direction = self.strategy.next_stop(
+                index, floor_no, direction, self.elevator_system
+            )
+            decision_ns.append(time.process_time_ns() - decision_started)
+
+            for target_floor_no, reqs in pending.items():
+                if is_skipped(
+                    target_floor_no,
+                    floor_no,
+                    prev_direction,
+                    next_stop.floor_no,
+                    direction,
+                ):
+                    for req in reqs:
+                        req.skip_count += 1
+            floors_travelled += abs(next_stop.floor_no - floor_no)
+            now += abs(next_stop.floor_no - floor_no) * self.floor_seconds
+            floor_no = next_stop.floor_no
+            moves_count += 1
+            serve(floor_no, now)
+            now += self.stop_seconds
+        elapsed = time.perf_counter() - started
+
+        return {
+            "strategy": self.strategy.name,
+            "pattern": self.pattern,
+            "stations_count": self.elevator_system.stations_count,
+            "simulated_seconds": now,
+            "passengers": len(journeys),
+            "moves": moves_count,
+            "floors_travelled": floors_travelled,
+            **summarize(waits, "wait"),
+            **summarize(journeys, "journey"),
+            "wall_seconds": elapsed,
+            "moves_per_second": moves_count / elapsed if elapsed else None,
+            **summarize([ns / 1000 for ns in decision_ns], "decision_cpu_us"),
+        }
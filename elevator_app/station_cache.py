@@ -0,0 +1,74 @@
+import threading
+from collections import OrderedDict
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from .models import ElevatorStation
+
+STATION_FIELD_NAMES = [field.attname for field in ElevatorStation._meta.concrete_fields]
+
+
+class StationCache:
+    """
+    Process-local LRU cache of the stations of elevator systems by floor number,
+    `None` for floors without a station. Entries are valid for the
+    `ElevatorSystem.stations_updated` stamp they were loaded for, so bumping it,
+    see `ElevatorLogic.save_maintenance`, reaches the caches of every process.
+    Every lookup returns a new instance.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def _get_cached(self, elevator_system, floor_no):
+        with self._lock:
+            entry = self._entries.get((elevator_system.pk, floor_no))
+            if entry is None or entry[0] != elevator_system.stations_updated:
+                return False, None
+            self._entries.move_to_end((elevator_system.pk, floor_no))
+        return True, self._to_station(entry[1])
+
+    def _cache(self, elevator_system, floor_no, row):
+        with self._lock:
+            self._entries[(elevator_system.pk, floor_no)] = (
+                elevator_system.stations_updated,
+                row,
+            )
+            self._entries.move_to_end((elevator_system.pk, floor_no))
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return self._to_station(row)
+
+    @staticmethod
+    def _to_station(row):
+        if row is None:
+            return None
+        return ElevatorStation.from_db(DEFAULT_DB_ALIAS, STATION_FIELD_NAMES, row)
+
+    @staticmethod
+    def _lookup(elevator_system, floor_no):
+        return ElevatorStation.objects.filter(
+            elevator_system=elevator_system, floor_no=floor_no
+        ).values_list(*STATION_FIELD_NAMES)
+
+    def get_station(self, elevator_system, floor_no):
+        hit, station = self._get_cached(elevator_system, floor_no)
+        if hit:
+            return station
+        return self._cache(
+            elevator_system, floor_no, self._lookup(elevator_system, floor_no).first()
+        )
+
+    async def aget_station(self, elevator_system, floor_no):
+        hit, station = self._get_cached(elevator_system, floor_no)
+        if hit:
+            return station
+        return self._cache(
+            elevator_system,
+            floor_no,
+            await self._lookup(elevator_system, floor_no).afirst(),
+        )
+
+
+station_cache = StationCache(settings.STATION_CACHE_SIZE)
@@ -0,0 +1,19 @@
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    return sorted_values[
+        min(len(sorted_values) - 1, int(len(sorted_values) * fraction))
+    ]
+
+
+def summarize(values, prefix):
+    """
+    Average & p50/p95/p99 of `values`, keyed `<prefix>_avg`, `<prefix>_p50`...
+    """
+    values = sorted(values)
+    return {
+        f"{prefix}_avg": sum(values) / len(values) if values else None,
+        f"{prefix}_p50": percentile(values, 0.50),
+        f"{prefix}_p95": percentile(values, 0.95),
+        f"{prefix}_p99": percentile(values, 0.99),
+    }
@@ -1,3 +1,733 @@
-from django.test import TestCase
+import random
+from datetime import timedelta
+from unittest import mock
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from . import archiver, batch_scheduler, event_log, messages
+from .elevator_logic import ElevatorLogic, PendingFloorIndex, SCHEDULING_STRATEGIES
+from .management.commands.snapshot_elevator_systems import (
+    Command as SnapshotCommand,
+)
+from .metrics import registry
+from .models import (
+    Directions,
+    ElevatorEvent,
+    ElevatorRequest,
+    ElevatorStation,
+    ElevatorSystem,
+    ElevatorSystemSnapshot,
+    EventKinds,
+)
+from .serializers import (
+    ElevatorSystemStateSerializer,
+    FastElevatorSystemStateSerializer,
+)
+from .station_cache import station_cache
 
-# Create your tests here.
+
+class ElevatorSystemTestMixin:
+    stations_count = 10
+
+    def setUp(self):
+        # Primary keys get reused between tests, drop the process-local caches.
+        cache.clear()
+        ElevatorLogic._indexes.clear()
+        station_cache._entries.clear()
+
+    def create_elevator_system(self, pending_count=0, building_name="Test"):
+        """
+        A new elevator system with `pending_count` pending requests, waiting for
+        the car on its first floor.
+        """
+        response = self.client.post(
+            reverse("inititate_elevator_system"),
+            {"building_name": building_name, "stations_count": self.stations_count},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        elevator_system = ElevatorSystem.objects.get(
+            pk=response.json()["new_elevator_system"]["id"]
+        )
+        stations = list(
+            ElevatorStation.objects.filter(elevator_system=elevator_system).order_by(
+                "floor_no"
+            )
+        )
+        ElevatorRequest.objects.bulk_create(
+            ElevatorRequest(
+                elevator_system=elevator_system,
+                from_station=stations[i % (len(stations) - 1) + 1],
+                to_station=stations[(i + 3) % (len(stations) - 1) + 1],
+            )
+            for i in range(pending_count)
+        )
+        return elevator_system
+
+
+class QueryCountTests(ElevatorSystemTestMixin, TestCase):
+    """
+    The number of queries of the state views must not grow with the number of
+    pending requests.
+    """
+
+    def assertSameNumQueries(self, get_response):
+        """
+        Runs `get_response(elevator_system)` against a system with 1 pending
+        request, then asserts it takes as many queries with 50.
+        """
+        elevator_system = self.create_elevator_system(pending_count=1)
+        with CaptureQueriesContext(connection) as queries:
+            response = get_response(elevator_system)
+        num_queries = len(queries)
+        self.assertEqual(response.status_code, 200, response.content)
+        elevator_system = self.create_elevator_system(pending_count=50)
+        with self.assertNumQueries(num_queries):
+            response = get_response(elevator_system)
+        self.assertEqual(response.status_code, 200, response.content)
+
+    def test_get_elevator_system(self):
+        self.assertSameNumQueries(
+            lambda elevator_system: self.client.get(
+                reverse("elevator_system", kwargs={"pk": elevator_system.pk})
+            )
+        )
+
+    def test_call_elevator(self):
+        self.assertSameNumQueries(
+            lambda elevator_system: self.client.patch(
+                reverse(
+                    "call_elevator",
+                    kwargs={"pk": elevator_system.pk, "from_floor_no": 5},
+                )
+            )
+        )
+
+    def test_select_floor(self):
+        self.assertSameNumQueries(
+            lambda elevator_system: self.client.patch(
+                reverse(
+                    "select_floor", kwargs={"pk": elevator_system.pk, "to_floor_no": 7}
+                )
+            )
+        )
+
+    def test_move_elevator(self):
+        self.assertSameNumQueries(
+            lambda elevator_system: self.client.patch(
+                reverse("move_elevator", kwargs={"pk": elevator_system.pk})
+            )
+        )
+
+    def test_mark_station_under_maintenance(self):
+        self.assertSameNumQueries(
+            lambda elevator_system: self.client.patch(
+                f"/elevator-app/mark-station-under-maintenance/{elevator_system.pk}/8/true/"
+            )
+        )
+
+
+class SkipCountTests(ElevatorSystemTestMixin, TestCase):
+    def call(self, elevator_system, from_floor_no):
+        response = self.client.patch(
+            reverse(
+                "call_elevator",
+                kwargs={"pk": elevator_system.pk, "from_floor_no": from_floor_no},
+            )
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+
+    def move(self, elevator_system):
+        response = self.client.patch(
+            reverse("move_elevator", kwargs={"pk": elevator_system.pk})
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()["Elevator Current State"]["curr_station"]["floor_no"]
+
+    def skip_count(self, elevator_system, from_floor_no):
+        return ElevatorRequest.objects.get(
+            elevator_system=elevator_system, from_station__floor_no=from_floor_no
+        ).skip_count
+
+    def test_look_sweep_does_not_skip_requests_left_behind(self):
+        elevator_system = self.create_elevator_system()
+        self.call(elevator_system, 5)
+        self.assertEqual(self.move(elevator_system), 5)
+        self.call(elevator_system, 3)
+        self.call(elevator_system, 8)
+        self.assertEqual(self.move(elevator_system), 8)
+        self.assertEqual(self.skip_count(elevator_system, 3), 0)
+        self.assertEqual(self.move(elevator_system), 3)
+
+    def test_passing_over_or_turning_short_of_a_request_skips_it(self):
+        elevator_system = self.create_elevator_system()
+        response = self.client.patch(
+            reverse(
+                "set_scheduling_strategy",
+                kwargs={"pk": elevator_system.pk, "strategy": "FCFS"},
+            )
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        self.call(elevator_system, 6)
+        self.call(elevator_system, 4)
+        self.call(elevator_system, 8)
+        self.assertEqual(self.move(elevator_system), 6)
+        self.assertEqual(self.skip_count(elevator_system, 4), 1)
+        self.assertEqual(self.skip_count(elevator_system, 8), 0)
+        self.assertEqual(self.move(elevator_system), 4)
+        self.assertEqual(self.skip_count(elevator_system, 8), 1)
+
+
+class BatchSchedulerTests(SimpleTestCase):
+    """
+    `batch_scheduler.next_floors` must pick the same next stops as
+    `LookStrategy.next_stop`, one system at a time.
+    """
+
+    stations_count = 20
+
+    @staticmethod
+    def make_index(floors=(), promoted_floors=()):
+        index = PendingFloorIndex()
+        for floor_no in floors:
+            index.add(floor_no, floor_no)
+        for floor_no in promoted_floors:
+            index.add(floor_no, floor_no, promoted=True)
+        return index
+
+    def assertMatchesLook(self, systems):
+        """
+        `systems` is a list of (index, current floor, direction).
+        """
+        indexes, curr_floors, directions = zip(*systems)
+        floors, going_up = batch_scheduler.next_floors(
+            curr_floors,
+            [direction == Directions.UP for direction in directions],
+            *batch_scheduler.csr_matrix([index._floors for index in indexes]),
+            *batch_scheduler.csr_matrix([index._promoted_floors for index in indexes]),
+        )
+        look_strategy = SCHEDULING_STRATEGIES["LOOK"]
+        for i, (index, floor_no, direction) in enumerate(systems):
+            next_stop, next_direction = look_strategy.next_stop(
+                index, floor_no, direction, None
+            )
+            self.assertEqual(
+                (floors[i], going_up[i]),
+                (
+                    next_stop.floor_no if next_stop else batch_scheduler.NO_FLOOR,
+                    next_direction == Directions.UP,
+                ),
+                f"floors {index._floors}, promoted {index._promoted_floors}, "
+                f"at {floor_no} going {direction}",
+            )
+
+    def test_randomized(self):
+        rng = random.Random(0)
+        systems = []
+        for _ in range(5000):
+            index = PendingFloorIndex()
+            for _ in range(rng.randint(0, 8)):
+                floor_no = rng.randint(1, self.stations_count)
+                index.add(floor_no, floor_no, promoted=rng.random() < 0.2)
+            systems.append(
+                (
+                    index,
+                    rng.randint(1, self.stations_count),
+                    rng.choice((Directions.UP, Directions.DOWN)),
+                )
+            )
+        self.assertMatchesLook(systems)
+
+    def test_empty_pending_sets(self):
+        self.assertMatchesLook(
+            [
+                (self.make_index(), floor_no, direction)
+                for floor_no in (1, 10, self.stations_count)
+                for direction in Directions
+            ]
+        )
+
+    def test_promoted_ties(self):
+        self.assertMatchesLook(
+            [
+                (self.make_index(floors, promoted_floors), 10, direction)
+                for floors, promoted_floors in (
+                    ((), (7, 13)),
+                    ((9, 11), (7, 13)),
+                    ((12,), (8, 12)),
+                    ((), (10, 7, 13)),
+                )
+                for direction in Directions
+            ]
+        )
+
+    def test_shaft_ends(self):
+        top = self.stations_count
+        self.assertMatchesLook(
+            [
+                (self.make_index(floors, promoted_floors), floor_no, direction)
+                for floors, promoted_floors in (
+                    ((1,), ()),
+                    ((top,), ()),
+                    ((1, top), ()),
+                    ((), (1, top)),
+                    ((2, top - 1), (1,)),
+                )
+                for floor_no in (1, top)
+                for direction in Directions
+            ]
+        )
+
+
+class CallElevatorBankTests(ElevatorSystemTestMixin, TestCase):
+    def call(self, elevator_bank_id, from_floor_no):
+        response = self.client.patch(
+            reverse(
+                "call_elevator_bank",
+                kwargs={"pk": elevator_bank_id, "from_floor_no": from_floor_no},
+            )
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def test_repeated_call_is_merged_into_the_called_car(self):
+        response = self.client.post(
+            reverse("initiate_elevator_bank"),
+            {"building_name": "Test", "stations_count": 10, "cars_count": 2},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        elevator_bank_id = response.json()["new_elevator_bank"]["id"]
+        called_car_id = self.call(elevator_bank_id, 5)["Elevator Current State"]["id"]
+
+        # Stops on the way make the other, idle car the nearest one.
+        called_car = ElevatorSystem.objects.get(pk=called_car_id)
+        stations = {
+            station.floor_no: station
+            for station in ElevatorStation.objects.filter(elevator_system=called_car)
+        }
+        ElevatorRequest.objects.bulk_create(
+            ElevatorRequest(
+                elevator_system=called_car,
+                from_station=stations[1],
+                to_station=stations[floor_no],
+            )
+            for floor_no in (2, 3, 4)
+        )
+        ElevatorLogic.invalidate(called_car)
+
+        data = self.call(elevator_bank_id, 5)
+        self.assertEqual(data["message"], messages.CALL_MERGED.format(floor_no=5))
+        self.assertEqual(data["Elevator Current State"]["id"], called_car_id)
+        self.assertEqual(
+            ElevatorRequest.objects.filter(
+                elevator_system__bank=elevator_bank_id,
+                from_station__floor_no=5,
+                to_station=None,
+                served_on=None,
+            ).count(),
+            1,
+        )
+
+
+class MaintenanceTests(ElevatorSystemTestMixin, TestCase):
+    def test_stamps_are_bumped_with_one_update(self):
+        elevator_system = self.create_elevator_system()
+        call_url = reverse(
+            "call_elevator", kwargs={"pk": elevator_system.pk, "from_floor_no": 8}
+        )
+        # Caches the station as not under maintenance.
+        self.assertEqual(self.client.patch(call_url).status_code, 200)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(
+                f"/elevator-app/mark-station-under-maintenance/{elevator_system.pk}/8/true/"
+            )
+        self.assertEqual(response.status_code, 200, response.content)
+        system_updates = [
+            query["sql"]
+            for query in queries.captured_queries
+            if query["sql"].startswith(f'UPDATE "{ElevatorSystem._meta.db_table}"')
+        ]
+        self.assertEqual(len(system_updates), 1, system_updates)
+        self.assertIn('"stations_updated"', system_updates[0])
+        self.assertIn('"updated"', system_updates[0])
+
+        response = self.client.patch(call_url)
+        self.assertIn("under maintenance", response.json()["message"])
+
+
+class ConditionalGetTests(ElevatorSystemTestMixin, TestCase):
+    def test_async_view_matches_sync_view(self):
+        elevator_system = self.create_elevator_system(pending_count=3)
+        urls = [
+            reverse(url_name, kwargs={"pk": elevator_system.pk})
+            for url_name in ("elevator_system", "async_elevator_system")
+        ]
+        responses = [self.client.get(url) for url in urls]
+        for response in responses:
+            self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(responses[0]["ETag"], responses[1]["ETag"])
+        self.assertEqual(responses[0].json(), responses[1].json())
+
+        etag = responses[0]["ETag"]
+        for url in urls:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response["ETag"], etag)
+
+        self.client.patch(
+            reverse(
+                "call_elevator", kwargs={"pk": elevator_system.pk, "from_floor_no": 9}
+            )
+        )
+        for url in urls:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotEqual(response["ETag"], etag)
+
+
+class MetricsMiddlewareTests(ElevatorSystemTestMixin, TestCase):
+    @staticmethod
+    def observed(observe, name, view):
+        return [
+            value
+            for observed_name, labels, value in (
+                call.args for call in observe.call_args_list
+            )
+            if observed_name == name and labels["view"] == view
+        ]
+
+    async def test_db_metrics_of_sync_views_under_asgi(self):
+        elevator_system = await sync_to_async(self.create_elevator_system)(
+            pending_count=2
+        )
+        with mock.patch.object(registry, "observe") as observe:
+            response = await self.async_client.get(
+                reverse("elevator_system", kwargs={"pk": elevator_system.pk})
+            )
+        self.assertEqual(response.status_code, 200)
+        (queries_count,) = self.observed(
+            observe, "elevator_app_db_queries", "elevator_system"
+        )
+        self.assertGreater(queries_count, 0)
+
+    def test_db_metrics_of_streamed_responses(self):
+        self.create_elevator_system()
+        with mock.patch.object(registry, "observe") as observe:
+            response = self.client.get(reverse("elevator_systems_ndjson"))
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(
+                self.observed(
+                    observe, "elevator_app_db_queries", "elevator_systems_ndjson"
+                ),
+                [],
+            )
+            b"".join(response.streaming_content)
+        (queries_count,) = self.observed(
+            observe, "elevator_app_db_queries", "elevator_systems_ndjson"
+        )
+        self.assertGreater(queries_count, 0)
+
+
+class FastStateSerializerTests(ElevatorSystemTestMixin, TestCase):
+    """
+    `FastElevatorSystemStateSerializer` must render the same JSON as
+    `ElevatorSystemStateSerializer`.
+    """
+
+    def assertSameJson(self, elevator_system=None):
+        if elevator_system is None:
+            elevator_system = ElevatorSystem.objects.select_related("curr_station").get(
+                pk=self.elevator_system.pk
+            )
+        renderer = JSONRenderer()
+        self.assertEqual(
+            renderer.render(FastElevatorSystemStateSerializer(elevator_system).data),
+            renderer.render(ElevatorSystemStateSerializer(elevator_system).data),
+        )
+
+    def patch(self, url_name, **kwargs):
+        response = self.client.patch(
+            reverse(url_name, kwargs={"pk": self.elevator_system.pk, **kwargs})
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+
+    def test_same_json(self):
+        self.elevator_system = self.create_elevator_system(
+            building_name='Tour "Élysée" \\ 東京'
+        )
+        self.assertSameJson()
+
+        self.patch("call_elevator", from_floor_no=5)
+        self.patch("call_elevator", from_floor_no=7)
+        self.assertSameJson()
+
+        self.patch("select_floor", to_floor_no=8)
+        self.assertSameJson()
+
+        self.client.patch(
+            f"/elevator-app/mark-station-under-maintenance/{self.elevator_system.pk}/7/true/"
+        )
+        self.client.patch(
+            f"/elevator-app/mark-station-under-maintenance/{self.elevator_system.pk}/9/true/"
+        )
+        self.assertSameJson()
+
+        # As the views hold it after a move, with an enum direction.
+        elevator_system, _, _ = ElevatorLogic.move_elevator(self.elevator_system)
+        self.assertSameJson(elevator_system)
+        self.assertSameJson()
+
+        self.patch("select_floor", to_floor_no=2)
+        self.patch("set_scheduling_strategy", strategy="SCAN")
+        self.assertSameJson()
+
+        for _ in range(4):
+            self.patch("move_elevator")
+        self.assertSameJson()
+
+
+class ElevatorEventsTests(ElevatorSystemTestMixin, TestCase):
+    def post_events(self, events):
+        response = self.client.post(
+            reverse("elevator_events"), events, content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()["results"]
+
+    def test_system_without_stations(self):
+        elevator_system = self.create_elevator_system()
+        stationless_system = ElevatorSystem.objects.create(
+            building_name="Empty", stations_count=0
+        )
+        results = self.post_events(
+            [
+                {
+                    "elevator_system": stationless_system.pk,
+                    "type": "call",
+                    "floor_no": 1,
+                },
+                {
+                    "elevator_system": stationless_system.pk,
+                    "type": "select",
+                    "floor_no": 1,
+                },
+                {"elevator_system": elevator_system.pk, "type": "call", "floor_no": 5},
+            ]
+        )
+        self.assertEqual([result["saved"] for result in results], [False, False, True])
+        self.assertEqual(
+            results[0]["message"],
+            messages.STATIONS_COUNT_EXCEEDED.format(stations_count=0),
+        )
+
+    def test_select_fills_pending_call(self):
+        presses = [("select", 4), ("call", 3), ("select", 6)]
+        api_system = self.create_elevator_system()
+        bulk_system = self.create_elevator_system()
+        for elevator_system in (api_system, bulk_system):
+            # A pending call from the floor the car waits on.
+            ElevatorRequest.objects.create(
+                elevator_system=elevator_system,
+                from_station=elevator_system.curr_station,
+            )
+        for press_type, floor_no in presses:
+            if press_type == "call":
+                url = reverse(
+                    "call_elevator",
+                    kwargs={"pk": api_system.pk, "from_floor_no": floor_no},
+                )
+            else:
+                url = reverse(
+                    "select_floor",
+                    kwargs={"pk": api_system.pk, "to_floor_no": floor_no},
+                )
+            self.client.patch(url)
+        results = self.post_events(
+            [
+                {
+                    "elevator_system": bulk_system.pk,
+                    "type": press_type,
+                    "floor_no": floor_no,
+                }
+                for press_type, floor_no in presses
+            ]
+        )
+        self.assertTrue(all(result["saved"] for result in results))
+
+        def pending_requests(elevator_system):
+            return sorted(
+                ElevatorRequest.objects.filter(
+                    elevator_system=elevator_system, served_on=None
+                ).values_list("from_station__floor_no", "to_station__floor_no"),
+                key=str,
+            )
+
+        self.assertEqual(pending_requests(api_system), [(1, 4), (1, 6), (3, None)])
+        self.assertEqual(pending_requests(bulk_system), pending_requests(api_system))
+        self.assertNotIn(bulk_system.pk, ElevatorLogic._indexes)
+
+
+class EventLogTests(ElevatorSystemTestMixin, TestCase):
+    def post(self, url_name, data):
+        response = self.client.post(
+            reverse(url_name), data, content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def test_initiate_systems_without_stations(self):
+        elevator_system_ids = [
+            self.post(
+                "inititate_elevator_system",
+                {"building_name": "Z", "stations_count": 0},
+            )["new_elevator_system"]["id"],
+            *(
+                elevator_system["id"]
+                for elevator_system in self.post(
+                    "inititate_elevator_systems",
+                    [
+                        {"building_name": "Z", "stations_count": 0},
+                        {"building_name": "Y", "stations_count": 3},
+                    ],
+                )["new_elevator_systems"]
+            ),
+        ]
+        elevator_bank_id = self.post(
+            "initiate_elevator_bank",
+            {"building_name": "Z", "stations_count": 0, "cars_count": 2},
+        )["new_elevator_bank"]["id"]
+        elevator_system_ids += ElevatorSystem.objects.filter(
+            bank=elevator_bank_id
+        ).values_list("id", flat=True)
+        self.assertEqual(len(elevator_system_ids), 5)
+
+        states = event_log.get_states(elevator_system_ids)
+        self.assertIsNone(states[elevator_system_ids[0]]["curr_station"])
+        self.assertEqual(states[elevator_system_ids[2]]["curr_floor_no"], 1)
+        self.assertIsNone(states[elevator_system_ids[4]]["curr_floor_no"])
+
+    def run_traffic(self, elevator_system, floor_nos):
+        """
+        Calls, selects & maintenance toggles on `floor_nos`, each followed by a
+        move. Repeated calls are merged.
+        """
+        for floor_no in floor_nos:
+            for url in (
+                reverse(
+                    "call_elevator",
+                    kwargs={"pk": elevator_system.pk, "from_floor_no": floor_no},
+                ),
+                reverse(
+                    "call_elevator",
+                    kwargs={"pk": elevator_system.pk, "from_floor_no": floor_no},
+                ),
+                reverse(
+                    "select_floor",
+                    kwargs={"pk": elevator_system.pk, "to_floor_no": floor_no + 2},
+                ),
+                "/elevator-app/mark-station-under-maintenance/"
+                f"{elevator_system.pk}/{floor_no + 1}/true/",
+                reverse("move_elevator", kwargs={"pk": elevator_system.pk}),
+                "/elevator-app/mark-station-under-maintenance/"
+                f"{elevator_system.pk}/{floor_no + 1}/false/",
+            ):
+                self.assertEqual(self.client.patch(url).status_code, 200, url)
+
+    def assertReplayMatchesTables(self, elevator_system_ids):
+        self.assertEqual(SnapshotCommand._verify(elevator_system_ids), [])
+
+    def test_replay_matches_tables(self):
+        elevator_systems = [self.create_elevator_system() for _ in range(2)]
+        self.run_traffic(elevator_systems[0], [5, 3, 7, 2])
+        self.run_traffic(elevator_systems[1], [4, 6])
+        kinds = set(
+            ElevatorEvent.objects.filter(
+                elevator_system=elevator_systems[0]
+            ).values_list("kind", flat=True)
+        )
+        self.assertEqual(kinds, {kind.value for kind in EventKinds})
+        self.assertTrue(
+            ElevatorEvent.objects.filter(
+                elevator_system=elevator_systems[0], data__merged=True
+            ).exists()
+        )
+        self.assertReplayMatchesTables(
+            [elevator_system.pk for elevator_system in elevator_systems]
+        )
+
+    def test_replay_from_snapshot(self):
+        elevator_system = self.create_elevator_system()
+        self.run_traffic(elevator_system, [5, 3])
+        self.assertEqual(
+            event_log.take_snapshots([elevator_system.pk], timezone.now()), 1
+        )
+        self.run_traffic(elevator_system, [7, 2])
+
+        # The replay starts from the snapshot, the events before it aren't read.
+        snapshot = ElevatorSystemSnapshot.objects.get(elevator_system=elevator_system)
+        ElevatorEvent.objects.filter(pk__lte=snapshot.last_event_id).delete()
+        self.assertReplayMatchesTables([elevator_system.pk])
+
+    def test_snapshot_stops_at_settle_cutoff(self):
+        elevator_system = self.create_elevator_system()
+        self.run_traffic(elevator_system, [5, 3, 7])
+        events = list(
+            ElevatorEvent.objects.filter(elevator_system=elevator_system).order_by("pk")
+        )
+        settled_before = timezone.now()
+        # As if the last events were appended by transactions still in flight.
+        ElevatorEvent.objects.filter(pk__gt=events[9].pk).update(
+            created=settled_before + timedelta(seconds=1)
+        )
+
+        self.assertEqual(
+            event_log.take_snapshots([elevator_system.pk], settled_before), 1
+        )
+        snapshot = ElevatorSystemSnapshot.objects.get(elevator_system=elevator_system)
+        self.assertEqual(snapshot.last_event_id, events[9].pk)
+        self.assertEqual(
+            snapshot.state, event_log.replay(event_log.initial_state(), events[:10])
+        )
+        self.assertEqual(
+            event_log.take_snapshots([elevator_system.pk], settled_before), 0
+        )
+        self.assertReplayMatchesTables([elevator_system.pk])
+
+
+class ArchiveTests(ElevatorSystemTestMixin, TestCase):
+    def test_archived_request_is_retrieved_unchanged(self):
+        elevator_system = self.create_elevator_system()
+        self.client.patch(
+            reverse(
+                "call_elevator", kwargs={"pk": elevator_system.pk, "from_floor_no": 3}
+            )
+        )
+        for _ in range(2):
+            self.client.patch(
+                reverse("move_elevator", kwargs={"pk": elevator_system.pk})
+            )
+        elevator_req = ElevatorRequest.objects.get(elevator_system=elevator_system)
+        self.assertIsNotNone(elevator_req.served_on)
+        url = reverse("elevator_request", kwargs={"pk": elevator_req.pk})
+        served_response = self.client.get(url)
+        self.assertEqual(served_response.status_code, 200)
+        updated = ElevatorSystem.objects.get(pk=elevator_system.pk).updated
+
+        self.assertEqual(archiver.archive_served_requests(timezone.now()), 1)
+        self.assertFalse(ElevatorRequest.objects.filter(pk=elevator_req.pk).exists())
+        self.assertGreater(
+            ElevatorSystem.objects.get(pk=elevator_system.pk).updated, updated
+        )
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), served_response.json())
+        self.assertEqual(response["ETag"], served_response["ETag"])
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=served_response["ETag"])
+        self.assertEqual(response.status_code, 304)
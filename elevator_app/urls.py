@@ -1,13 +1,33 @@
 from django.urls import path, re_path
+from .async_views import (
+    AsyncElevatorSystemInstanceView,
+    AsyncMoveElevator,
+    AsyncCallElevator,
+    AsyncSelectFloorView,
+    AsyncMarkStationUnderMaintenanceView,
+    ElevatorSystemStateStreamView,
+)
 from .views import (
     ElevatorSystemInstanceView,
     ElevatorSystemsView,
+    InitiateElevatorSystemsView,
     MoveElevator,
     CallElevator,
     SelectFloorView,
     ElevatorReqModelVS,
+    ElevatorRequestHistoryView,
+    ElevatorRequestExportView,
+    ElevatorSystemsNdjsonView,
+    ElevatorStationsNdjsonView,
+    ElevatorRequestsNdjsonView,
     ElevatorStationVS,
     MarkStationUnderMaintenanceView,
+    ElevatorBankView,
+    InitiateElevatorBankView,
+    CallElevatorBank,
+    SetSchedulingStrategyView,
+    ElevatorEventsView,
+    MetricsView,
 )
 
 urlpatterns = [
@@ -16,16 +36,63 @@ urlpatterns = [
         ElevatorSystemInstanceView.as_view(),
         name="elevator_system",
     ),
+    path(
+        "elevator-system/<int:pk>/requests",
+        ElevatorRequestHistoryView.as_view(),
+        name="elevator_request_history",
+    ),
+    path(
+        "elevator-system/<int:pk>/requests/export",
+        ElevatorRequestExportView.as_view(),
+        name="elevator_request_export",
+    ),
     path(
         "elevator-systems",
         ElevatorSystemsView.as_view(),
         name="elevator_systems",
     ),
+    path(
+        "elevator-systems/ndjson",
+        ElevatorSystemsNdjsonView.as_view(),
+        name="elevator_systems_ndjson",
+    ),
+    path(
+        "elevator-stations/ndjson",
+        ElevatorStationsNdjsonView.as_view(),
+        name="elevator_stations_ndjson",
+    ),
+    path(
+        "elevator-requests/ndjson",
+        ElevatorRequestsNdjsonView.as_view(),
+        name="elevator_requests_ndjson",
+    ),
     path(
         "initiate-elevator-system",
         ElevatorSystemsView.as_view(),
         name="inititate_elevator_system",
     ),
+    path(
+        "initiate-elevator-systems",
+        InitiateElevatorSystemsView.as_view(),
+        name="inititate_elevator_systems",
+    ),
+    path(
+        "elevator-bank/<int:pk>",
+        ElevatorBankView.as_view(),
+        name="elevator_bank",
+    ),
+    path(
+        "initiate-elevator-bank",
+        InitiateElevatorBankView.as_view(),
+        name="initiate_elevator_bank",
+    ),
+    path(
+        "call-elevator-bank/<int:pk>/<int:from_floor_no>",
+        CallElevatorBank.as_view(),
+        name="call_elevator_bank",
+    ),
+    path("elevator-events", ElevatorEventsView.as_view(), name="elevator_events"),
+    path("metrics", MetricsView.as_view(), name="metrics"),
     path("move-elevator/<int:pk>", MoveElevator.as_view(), name="move_elevator"),
     path(
         "call-elevator/<int:pk>/<int:from_floor_no>",
@@ -37,6 +104,11 @@ urlpatterns = [
         SelectFloorView.as_view(),
         name="select_floor",
     ),
+    path(
+        "set-scheduling-strategy/<int:pk>/<str:strategy>",
+        SetSchedulingStrategyView.as_view(),
+        name="set_scheduling_strategy",
+    ),
     path(
         "elevator-request/<int:pk>",
         ElevatorReqModelVS.as_view(actions={"get": "retrieve"}),
@@ -48,8 +120,38 @@ urlpatterns = [
         name="elevator_station",
     ),
     re_path(
-        r"mark-station-under-maintenance/(?P<pk>[0-9]+)/(?P<floor_no>[0-9]+)/(?P<flag>(true|false).)",
+        r"^mark-station-under-maintenance/(?P<pk>[0-9]+)/(?P<floor_no>[0-9]+)/(?P<flag>(true|false).)",
         MarkStationUnderMaintenanceView.as_view(),
         name="mark_station_under_maintenance",
     ),
+    path(
+        "async/elevator-system/<int:pk>",
+        AsyncElevatorSystemInstanceView.as_view(),
+        name="async_elevator_system",
+    ),
+    path(
+        "elevator-system/<int:pk>/stream",
+        ElevatorSystemStateStreamView.as_view(),
+        name="elevator_system_stream",
+    ),
+    path(
+        "async/move-elevator/<int:pk>",
+        AsyncMoveElevator.as_view(),
+        name="async_move_elevator",
+    ),
+    path(
+        "async/call-elevator/<int:pk>/<int:from_floor_no>",
+        AsyncCallElevator.as_view(),
+        name="async_call_elevator",
+    ),
+    path(
+        "async/select-floor/<int:pk>/<int:to_floor_no>",
+        AsyncSelectFloorView.as_view(),
+        name="async_select_floor",
+    ),
+    re_path(
+        r"^async/mark-station-under-maintenance/(?P<pk>[0-9]+)/(?P<floor_no>[0-9]+)/(?P<flag>(true|false).)",
+        AsyncMarkStationUnderMaintenanceView.as_view(),
+        name="async_mark_station_under_maintenance",
+    ),
 ]
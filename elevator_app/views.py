@@ -1,19 +1,43 @@
+import json
+from django.core.cache import cache
+from django.db.models import F, Q
+from django.http import Http404, HttpResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
-from django.db.models import Q
+from django.utils.http import parse_etags
+from django.views import View
+from django.db import transaction
 from django.utils import timezone
-from rest_framework.generics import GenericAPIView
+from rest_framework.exceptions import ValidationError
+from rest_framework.generics import GenericAPIView, ListAPIView, RetrieveAPIView
+from rest_framework.pagination import CursorPagination
 from rest_framework.mixins import RetrieveModelMixin, ListModelMixin
 from rest_framework.viewsets import ReadOnlyModelViewSet
 from rest_framework.views import APIView
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from .serializers import (
     ElevatorSystemIntanceSerializer,
+    FastElevatorSystemStateSerializer,
+    MiniElevatorRequestSerializer,
     MiniElevatorSystemSerializer,
     ElevatorRequestIntanceSerializer,
     ElevatorStationDetailSerializer,
+    ElevatorBankSerializer,
+    ElevatorEventSerializer,
+    url_template,
 )
-from .models import ElevatorSystem, ElevatorRequest, ElevatorStation
-from .elevator_logic import ElevatorLogic
+from .models import (
+    ArchivedElevatorRequest,
+    ElevatorBank,
+    ElevatorSystem,
+    ElevatorRequest,
+    ElevatorStation,
+)
+from .elevator_logic import ElevatorLogic, CarDispatcher, SCHEDULING_STRATEGIES
+from .datetimes import parse_aware_datetime
+from .station_cache import station_cache
+from .metrics import registry
+from . import event_log, history_export, messages
 
 
 class RetrieveIsGetMixin:
@@ -21,13 +45,62 @@ class RetrieveIsGetMixin:
         return self.retrieve(request, *args, **kwargs)
 
 
+class ConditionalRetrieveMixin:
+    """
+    Strong ETags for retrieve views, derived from the `updated` stamp of the object.
+    A matching `If-None-Match` gets a 304 without serializing anything, other
+    GETs reuse the serialized data cached under the ETag. Objects which can no
+    longer change are cached for good, by the server & the clients.
+    """
+
+    cache_timeout = 300
+    immutable_max_age = 365 * 24 * 3600
+
+    def get_etag(self, instance):
+        model_name, updated = instance._meta.model_name, instance.updated.timestamp()
+        return f'"{model_name}-{instance.pk}-{updated}"'
+
+    def is_immutable(self, instance):
+        return False
+
+    def get_conditional_headers(self, instance):
+        headers = {"ETag": self.get_etag(instance)}
+        if self.is_immutable(instance):
+            headers["Cache-Control"] = f"max-age={self.immutable_max_age}, immutable"
+        return headers
+
+    @staticmethod
+    def is_not_modified(request, etag):
+        if_none_match = parse_etags(request.headers.get("If-None-Match", ""))
+        return etag in if_none_match or "*" in if_none_match
+
+    def get_cache_timeout(self, instance):
+        return None if self.is_immutable(instance) else self.cache_timeout
+
+    @staticmethod
+    def get_cache_key(etag):
+        return f"elevator_app:{etag}"
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        headers = self.get_conditional_headers(instance)
+        if self.is_not_modified(request, headers["ETag"]):
+            return Response(status=304, headers=headers)
+        cache_key = self.get_cache_key(headers["ETag"])
+        data = cache.get(cache_key)
+        if data is None:
+            data = self.get_serializer(instance).data
+            cache.set(cache_key, data, self.get_cache_timeout(instance))
+        return Response(data, headers=headers)
+
+
 class GetElevatorSystemInstanceMixin(RetrieveModelMixin, RetrieveIsGetMixin):
-    queryset = ElevatorSystem.objects.all()
+    queryset = ElevatorSystem.objects.select_related("curr_station")
     serializer_class = ElevatorSystemIntanceSerializer
 
     def get_object(request):
         elevator_system = get_object_or_404(
-            ElevatorSystem, pk=request.kwargs.get("pk", None)
+            request.queryset, pk=request.kwargs.get("pk", None)
         )
         return elevator_system
 
@@ -43,74 +116,646 @@ class GetElevatorSystemListMixin(ListModelMixin, RetrieveIsGetMixin):
         return self.list(request, *args, **kwargs)
 
 
-class ElevatorSystemInstanceView(GetElevatorSystemInstanceMixin, GenericAPIView):
-    pass
+class ElevatorSystemInstanceView(
+    ConditionalRetrieveMixin, GetElevatorSystemInstanceMixin, GenericAPIView
+):
+    """
+    Every change to the requests or stations of a system bumps its `updated`,
+    see `ElevatorLogic`, so it also stamps the nested requests & stations.
+    """
+
+
+class ElevatorRequestHistoryPagination(CursorPagination):
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 500
+    ordering = ("-created", "-id")
+
+
+class DateTimeParamsMixin:
+    def _get_datetime_param(self, name):
+        value = self.request.query_params.get(name)
+        if not value:
+            return None
+        parsed = parse_aware_datetime(value)
+        if parsed is None:
+            raise ValidationError({name: "Expected an ISO 8601 datetime."})
+        return parsed
+
+
+class ElevatorRequestHistoryView(DateTimeParamsMixin, ListAPIView):
+    """
+    Cursor paginated request history of an elevator system, newest first.
+    Accepts optional `since` & `until` ISO 8601 datetimes to window the history.
+    """
+
+    serializer_class = MiniElevatorRequestSerializer
+    pagination_class = ElevatorRequestHistoryPagination
+
+    def get_queryset(self):
+        elevator_system = get_object_or_404(ElevatorSystem, pk=self.kwargs["pk"])
+        elevator_reqs = ElevatorRequest.objects.filter(
+            elevator_system=elevator_system
+        ).select_related("from_station", "to_station")
+        since = self._get_datetime_param("since")
+        if since:
+            elevator_reqs = elevator_reqs.filter(created__gte=since)
+        until = self._get_datetime_param("until")
+        if until:
+            elevator_reqs = elevator_reqs.filter(created__lt=until)
+        return elevator_reqs
+
+
+class ElevatorRequestExportView(DateTimeParamsMixin, APIView):
+    """
+    Streams the request history of an elevator system, archived requests included,
+    in the columnar format of `history_export`, read back with
+    `history_export.read_chunks`. Accepts the same `since` & `until` as
+    `ElevatorRequestHistoryView`.
+    """
+
+    def get(self, request, *args, **kwargs):
+        elevator_system = get_object_or_404(ElevatorSystem, pk=kwargs["pk"])
+        response = StreamingHttpResponse(
+            history_export.export_chunks(
+                history_export.request_querysets(
+                    elevator_system=elevator_system,
+                    since=self._get_datetime_param("since"),
+                    until=self._get_datetime_param("until"),
+                )
+            ),
+            content_type=history_export.CONTENT_TYPE,
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="elevator-system-{elevator_system.pk}-requests.npychunks"'
+        )
+        return response
+
+
+class NdjsonListView(APIView):
+    """
+    Streams `get_queryset()` as newline-delimited JSON, one object of `values`
+    per row, fetched through a server-side cursor (on PostgreSQL) `chunk_size`
+    rows at a time. No model instances or serializers are involved, so memory
+    use does not grow with the number of rows.
+    """
+
+    content_type = "application/x-ndjson"
+    chunk_size = 2000
+    # Passed to `QuerySet.values()`, the aliases come after the fields.
+    fields = ()
+    aliases = {}
+    datetime_fields = ()
+    url_name = None
+
+    def get_queryset(self):
+        raise NotImplementedError
+
+    def _get_int_param(self, name):
+        value = self.request.query_params.get(name)
+        if not value:
+            return None
+        if not value.isdigit():
+            raise ValidationError({name: "Expected an integer."})
+        return int(value)
+
+    def get(self, request, *args, **kwargs):
+        rows = (
+            self.get_queryset()
+            .order_by("pk")
+            .values(*self.fields, **self.aliases)
+            .iterator(chunk_size=self.chunk_size)
+        )
+        return StreamingHttpResponse(self.render(rows), content_type=self.content_type)
+
+    def render(self, rows):
+        datetime_format = api_settings.DATETIME_FORMAT
+        # Reversed once, `reverse()` per row would cost more than the rest.
+        row_url = url_template(self.url_name) if self.url_name else None
+        lines = []
+        for row in rows:
+            for field in self.datetime_fields:
+                if row[field] is not None:
+                    row[field] = timezone.localtime(row[field]).strftime(
+                        datetime_format
+                    )
+            if row_url:
+                row["url"] = row_url.format(pk=row["id"])
+            lines.append(json.dumps(row))
+            if len(lines) == self.chunk_size:
+                yield "\n".join(lines) + "\n"
+                lines = []
+        if lines:
+            yield "\n".join(lines) + "\n"
+
+
+class ElevatorSystemsNdjsonView(NdjsonListView):
+    """
+    All elevator systems, optionally of a `bank`, as NDJSON.
+    """
+
+    fields = (
+        "id",
+        "building_name",
+        "stations_count",
+        "scheduling_strategy",
+        "created",
+        "curr_direction",
+        "bank",
+    )
+    aliases = {"curr_floor_no": F("curr_station__floor_no")}
+    datetime_fields = ("created",)
+    url_name = "elevator_system"
+
+    def get_queryset(self):
+        elevator_systems = ElevatorSystem.objects.all()
+        bank = self._get_int_param("bank")
+        if bank is not None:
+            elevator_systems = elevator_systems.filter(bank=bank)
+        return elevator_systems
+
+
+class ElevatorStationsNdjsonView(NdjsonListView):
+    """
+    All elevator stations, optionally of an `elevator_system`, as NDJSON.
+    """
+
+    fields = ("id", "elevator_system", "floor_no", "under_maintenance_since")
+    datetime_fields = ("under_maintenance_since",)
+    url_name = "elevator_station"
+
+    def get_queryset(self):
+        stations = ElevatorStation.objects.all()
+        elevator_system = self._get_int_param("elevator_system")
+        if elevator_system is not None:
+            stations = stations.filter(elevator_system=elevator_system)
+        return stations
+
+
+class ElevatorRequestsNdjsonView(DateTimeParamsMixin, NdjsonListView):
+    """
+    The requests not archived yet, optionally of an `elevator_system` and created
+    within [`since`, `until`), as NDJSON.
+    """
+
+    fields = ("id", "elevator_system", "created", "served_on", "skip_count")
+    aliases = {
+        "from_floor_no": F("from_station__floor_no"),
+        "to_floor_no": F("to_station__floor_no"),
+    }
+    datetime_fields = ("created", "served_on")
+    url_name = "elevator_request"
+
+    def get_queryset(self):
+        elevator_reqs = ElevatorRequest.objects.all()
+        elevator_system = self._get_int_param("elevator_system")
+        if elevator_system is not None:
+            elevator_reqs = elevator_reqs.filter(elevator_system=elevator_system)
+        since = self._get_datetime_param("since")
+        if since:
+            elevator_reqs = elevator_reqs.filter(created__gte=since)
+        until = self._get_datetime_param("until")
+        if until:
+            elevator_reqs = elevator_reqs.filter(created__lt=until)
+        return elevator_reqs
 
 
-class ElevatorReqModelVS(ReadOnlyModelViewSet):
-    queryset = ElevatorRequest.objects.all()
+class ElevatorReqModelVS(ConditionalRetrieveMixin, ReadOnlyModelViewSet):
+    """
+    Requests moved to the archive, see `archiver`, are retrieved from there.
+    """
+
+    queryset = ElevatorRequest.objects.select_related("from_station", "to_station")
     serializer_class = ElevatorRequestIntanceSerializer
 
+    def get_object(self):
+        try:
+            return super().get_object()
+        except Http404:
+            return get_object_or_404(
+                ArchivedElevatorRequest.objects.select_related(
+                    "from_station", "to_station"
+                ),
+                pk=self.kwargs["pk"],
+            )
+
+    def get_etag(self, instance):
+        # Archived requests keep the ETag they were served with.
+        return f'"elevatorrequest-{instance.pk}-{instance.updated.timestamp()}"'
+
+    def is_immutable(self, instance):
+        return instance.served_on is not None
+
+
+STATIONS_BATCH_SIZE = 5000
+
+
+@transaction.atomic
+def initiate_elevator_systems(elevator_systems):
+    """
+    Saves the new `elevator_systems` and all of their stations with bulk INSERTs,
+    and starts every elevator at its first station.
+    """
+    elevator_systems = ElevatorSystem.objects.bulk_create(elevator_systems)
+    new_elevator_stations = ElevatorStation.objects.bulk_create(
+        (
+            ElevatorStation(floor_no=i + 1, elevator_system=elevator_system)
+            for elevator_system in elevator_systems
+            for i in range(elevator_system.stations_count)
+        ),
+        batch_size=STATIONS_BATCH_SIZE,
+    )
+    first_stations = {
+        station.elevator_system_id: station
+        for station in new_elevator_stations
+        if station.floor_no == 1
+    }
+    for elevator_system in elevator_systems:
+        elevator_system.curr_station = first_stations.get(elevator_system.pk)
+    ElevatorSystem.objects.bulk_update(elevator_systems, ["curr_station"])
+    event_log.append(
+        [
+            event_log.initiate_event(elevator_system)
+            for elevator_system in elevator_systems
+        ]
+    )
+    return elevator_systems
+
+
+EVENTS_BATCH_MAX_SIZE = 5000
+
+
+def check_elevator_event(event, elevator_system, station):
+    """
+    The same checks as the call & select floor APIs, returns the error message or
+    `None` if the event can be saved.
+    """
+    if elevator_system is None:
+        return messages.ELEVATOR_SYSTEM_NOT_FOUND.format(
+            elevator_system_id=event["elevator_system"]
+        )
+    curr_station = elevator_system.curr_station
+    # Systems initiated without stations have no current station.
+    curr_floor_no = curr_station.floor_no if curr_station else None
+    if event["type"] == "call" and curr_floor_no == event["floor_no"]:
+        return messages.ALREADY_ON_CALLED_FLOOR.format(floor_no=curr_floor_no)
+    if station is None:
+        return messages.STATIONS_COUNT_EXCEEDED.format(
+            stations_count=elevator_system.stations_count
+        )
+    if station.under_maintenance_since:
+        if event["type"] == "call":
+            return messages.CALLED_STATION_UNDER_MAINTENANCE.format(
+                floor_no=event["floor_no"]
+            )
+        return messages.SELECTED_STATION_UNDER_MAINTENANCE.format(
+            floor_no=event["floor_no"]
+        )
+    if event["type"] == "select" and curr_floor_no == event["floor_no"]:
+        return messages.ALREADY_ON_SELECTED_FLOOR.format(floor_no=curr_floor_no)
+    return None
+
+
+@transaction.atomic
+def ingest_elevator_events(events):
+    """
+    Saves the call & select `events` of many elevator systems with a fixed number
+    of queries: the systems are locked & loaded at once, floors are checked against
+    a preloaded station map and the new calls & selects are saved with one bulk
+    INSERT each. Calls from a station with a pending call are merged into it, a
+    select fills in the pending call from the current station if any, like
+    `ElevatorLogic.save_select`. Returns a result per event, in order.
+    """
+    elevator_systems = {
+        elevator_system.pk: elevator_system
+        for elevator_system in ElevatorSystem.objects.select_for_update(of=("self",))
+        .select_related("curr_station")
+        .filter(pk__in={event["elevator_system"] for event in events})
+        .order_by("pk")
+    }
+    stations = {
+        (station.elevator_system_id, station.floor_no): station
+        for station in ElevatorStation.objects.filter(
+            elevator_system__in=elevator_systems.keys(),
+            floor_no__in={event["floor_no"] for event in events},
+        )
+    }
+    pending_call_ids = dict(
+        ElevatorRequest.objects.filter(
+            Q(from_station__in=stations.values())
+            | Q(
+                from_station__in=[
+                    elevator_system.curr_station_id
+                    for elevator_system in elevator_systems.values()
+                ]
+            ),
+            to_station=None,
+            served_on=None,
+        ).values_list("from_station_id", "id")
+    )
+    results, new_calls, new_selects, filled_calls = [], {}, [], []
+    for event in events:
+        elevator_system = elevator_systems.get(event["elevator_system"])
+        station = stations.get((event["elevator_system"], event["floor_no"]))
+        error = check_elevator_event(event, elevator_system, station)
+        if error:
+            results.append({**event, "saved": False, "merged": False, "message": error})
+            continue
+        if event["type"] == "call":
+            merged = station.pk in pending_call_ids or station.pk in new_calls
+            if not merged:
+                new_calls[station.pk] = ElevatorRequest(
+                    from_station=station, elevator_system=elevator_system
+                )
+            new_elevator_req = new_calls.get(station.pk)
+        else:
+            # Like `ElevatorLogic.save_select`, fills in the pending call from the
+            # current station if any.
+            merged = False
+            new_elevator_req = ElevatorRequest(
+                pk=pending_call_ids.pop(elevator_system.curr_station_id, None),
+                from_station=elevator_system.curr_station,
+                to_station=station,
+                elevator_system=elevator_system,
+                updated=timezone.now(),
+            )
+            if new_elevator_req.pk is None:
+                new_selects.append(new_elevator_req)
+            else:
+                filled_calls.append(new_elevator_req)
+        results.append(
+            {
+                **event,
+                "saved": not merged,
+                "merged": merged,
+                "request_id": pending_call_ids.get(station.pk) if merged else None,
+                "elevator_request": new_elevator_req,
+            }
+        )
+    ElevatorRequest.objects.bulk_create(new_selects)
+    ElevatorRequest.objects.bulk_update(filled_calls, ["to_station", "updated"])
+    # Calls merged into one saved concurrently by the call API are skipped by the
+    # INSERT, which also leaves the pks unset, so they are read back.
+    ElevatorRequest.objects.bulk_create(new_calls.values(), ignore_conflicts=True)
+    new_call_ids = dict(
+        ElevatorRequest.objects.filter(
+            from_station__in=new_calls.keys(), to_station=None, served_on=None
+        ).values_list("from_station_id", "id")
+    )
+    for station_id, new_call in new_calls.items():
+        new_call.pk = new_call_ids.get(station_id)
+    new_elevator_reqs = [*new_calls.values(), *new_selects]
+    ElevatorLogic.record_requests(
+        [
+            elevator_systems[elevator_system_id]
+            for elevator_system_id in {
+                elevator_req.elevator_system_id
+                for elevator_req in (*new_elevator_reqs, *filled_calls)
+            }
+        ],
+        new_elevator_reqs,
+        edited_system_ids={
+            elevator_req.elevator_system_id for elevator_req in filled_calls
+        },
+    )
+    events = []
+    for result in results:
+        elevator_req = result.pop("elevator_request", None)
+        if elevator_req is not None:
+            result["request_id"] = elevator_req.pk
+        if result["saved"] or result["merged"]:
+            events.append(
+                event_log.select_event(elevator_req)
+                if result["type"] == "select"
+                else event_log.call_event(
+                    ElevatorRequest(
+                        pk=result["request_id"],
+                        elevator_system=elevator_systems[result["elevator_system"]],
+                        from_station=stations[
+                            (result["elevator_system"], result["floor_no"])
+                        ],
+                    ),
+                    merged=result["merged"],
+                )
+            )
+        if result["merged"]:
+            result["message"] = messages.CALL_MERGED.format(floor_no=result["floor_no"])
+        elif result["saved"]:
+            result["message"] = (
+                messages.CALL_SAVED
+                if result["type"] == "call"
+                else messages.SELECT_SAVED
+            )
+    event_log.append(events)
+    return results
+
+
+class ElevatorEventsView(APIView):
+    """
+    Bulk ingestion of call & select button presses across elevator systems, e.g.
+    from a sensor gateway. Every event gets the outcome the call or select floor
+    API would have given it.
+    """
+
+    def post(self, request, *args, **kwargs):
+        events_serializer = ElevatorEventSerializer(
+            data=request.data,
+            many=True,
+            allow_empty=False,
+            max_length=EVENTS_BATCH_MAX_SIZE,
+        )
+        events_serializer.is_valid(raise_exception=True)
+        results = ingest_elevator_events(events_serializer.validated_data)
+        return Response(
+            {
+                "message": messages.EVENTS_SAVED.format(
+                    saved_count=sum(1 for result in results if result["saved"]),
+                    events_count=len(results),
+                ),
+                "results": results,
+            }
+        )
+
 
 class ElevatorSystemsView(GetElevatorSystemListMixin, GenericAPIView):
     def post(self, request, *args, **kwargs):
         elevator_system_serializer = ElevatorSystemIntanceSerializer(data=request.data)
         if not elevator_system_serializer.is_valid(raise_exception=True):
             return Response({"Error": "Some Error Occured, Please try again!"})
-        new_elevator_system = elevator_system_serializer.save()
-        first_station = None
-        for i in range(elevator_system_serializer.data.get("stations_count", 0)):
-            new_elevator_station = ElevatorStation(
-                floor_no=i + 1, elevator_system=new_elevator_system
-            )
-            new_elevator_station.save()
-            if not first_station:
-                first_station = new_elevator_station
-        new_elevator_system.curr_station = first_station
-        new_elevator_system.save()
+        (new_elevator_system,) = initiate_elevator_systems(
+            [ElevatorSystem(**elevator_system_serializer.validated_data)]
+        )
         return Response(
             {
                 "message": "New Elevator System created successfully!!",
-                "new_elevator_system": elevator_system_serializer.data,
+                "new_elevator_system": ElevatorSystemIntanceSerializer(
+                    new_elevator_system
+                ).data,
+            }
+        )
+
+
+class InitiateElevatorSystemsView(APIView):
+    """
+    Initiates a list of elevator systems, e.g. every building of a site, at once.
+    """
+
+    def post(self, request, *args, **kwargs):
+        elevator_systems_serializer = MiniElevatorSystemSerializer(
+            data=request.data, many=True
+        )
+        elevator_systems_serializer.is_valid(raise_exception=True)
+        new_elevator_systems = initiate_elevator_systems(
+            [
+                ElevatorSystem(**validated_data)
+                for validated_data in elevator_systems_serializer.validated_data
+            ]
+        )
+        return Response(
+            {
+                "message": f"{len(new_elevator_systems)} New Elevator Systems created successfully!!",
+                "new_elevator_systems": MiniElevatorSystemSerializer(
+                    new_elevator_systems, many=True
+                ).data,
+            }
+        )
+
+
+class ElevatorBankView(RetrieveAPIView):
+    queryset = ElevatorBank.objects.prefetch_related("cars")
+    serializer_class = ElevatorBankSerializer
+
+
+class InitiateElevatorBankView(APIView):
+    """
+    Initiates an elevator bank of `cars_count` elevator systems (cars) serving the
+    same `stations_count` floors.
+    """
+
+    def post(self, request, *args, **kwargs):
+        elevator_bank_serializer = ElevatorBankSerializer(data=request.data)
+        elevator_bank_serializer.is_valid(raise_exception=True)
+        cars_count = elevator_bank_serializer.validated_data.pop("cars_count")
+        with transaction.atomic():
+            new_elevator_bank = elevator_bank_serializer.save()
+            initiate_elevator_systems(
+                [
+                    ElevatorSystem(
+                        bank=new_elevator_bank,
+                        building_name=new_elevator_bank.building_name,
+                        stations_count=new_elevator_bank.stations_count,
+                    )
+                    for _ in range(cars_count)
+                ]
+            )
+        return Response(
+            {
+                "message": "New Elevator Bank created successfully!!",
+                "new_elevator_bank": ElevatorBankSerializer(new_elevator_bank).data,
+            }
+        )
+
+
+class CallElevatorBank(APIView):
+    """
+    A hall call to an elevator bank, assigned to the car with the lowest
+    estimated time to arrival.
+    """
+
+    @transaction.atomic
+    def patch(self, request, pk, from_floor_no):
+        # Calls to the bank are serialized from the called car lookup to the save,
+        # so concurrent presses can't dispatch two cars to the same floor.
+        elevator_bank = get_object_or_404(
+            ElevatorBank.objects.select_for_update(), pk=pk
+        )
+        if not 1 <= from_floor_no <= elevator_bank.stations_count:
+            return Response(
+                {
+                    "message": messages.STATIONS_COUNT_EXCEEDED.format(
+                        stations_count=elevator_bank.stations_count
+                    ),
+                }
+            )
+        from_stations = {
+            station.elevator_system_id: station
+            for station in ElevatorStation.objects.filter(
+                elevator_system__bank=elevator_bank,
+                floor_no=from_floor_no,
+                under_maintenance_since=None,
+            )
+        }
+        cars = list(
+            ElevatorSystem.objects.select_related("curr_station").filter(
+                pk__in=from_stations.keys()
+            )
+        )
+        # Repeated presses go to the car already called to the floor, if any.
+        called_car_id = (
+            ElevatorRequest.objects.filter(
+                from_station__in=from_stations.values(), to_station=None, served_on=None
+            )
+            .values_list("elevator_system_id", flat=True)
+            .first()
+        )
+        if called_car_id is not None:
+            elevator_system = next(car for car in cars if car.pk == called_car_id)
+        else:
+            elevator_system = CarDispatcher.assign(
+                from_floor_no, cars, ElevatorLogic.get_pending_indexes(cars)
+            )
+        if elevator_system is None:
+            return Response(
+                {"message": messages.NO_CAR_AVAILABLE.format(floor_no=from_floor_no)}
+            )
+        if elevator_system.curr_station.floor_no == from_floor_no:
+            data = FastElevatorSystemStateSerializer(elevator_system).data
+            return Response(
+                {
+                    "message": messages.ALREADY_ON_CALLED_FLOOR.format(
+                        floor_no=from_floor_no
+                    ),
+                    "Elevator Current State": data,
+                }
+            )
+        _, merged = ElevatorLogic.save_call(
+            elevator_system, from_stations[elevator_system.pk]
+        )
+        data = FastElevatorSystemStateSerializer(elevator_system).data
+        return Response(
+            {
+                "message": (
+                    messages.CALL_MERGED.format(floor_no=from_floor_no)
+                    if merged
+                    else messages.CALL_ASSIGNED.format(
+                        elevator_system_id=elevator_system.pk
+                    )
+                ),
+                "Elevator Current State": data,
             }
         )
 
 
 class MoveElevator(APIView, GetElevatorSystemInstanceMixin):
     def patch(self, request, pk):
-        elevator_system = get_object_or_404(ElevatorSystem, pk=pk)
-        next_stop, direction = ElevatorLogic.get_next_request(elevator_system)
-        if next_stop is None:
-            data = ElevatorSystemIntanceSerializer(elevator_system).data
+        elevator_system = get_object_or_404(self.queryset, pk=pk)
+        elevator_system, reached_station, served_req_ids = ElevatorLogic.move_elevator(
+            elevator_system
+        )
+        data = FastElevatorSystemStateSerializer(elevator_system).data
+        if reached_station is None:
             return Response(
                 {
-                    "message": "There are no requests to move the elevator, Use call or select elevators and try again!",
+                    "message": messages.NO_REQUESTS_TO_MOVE,
                     "Elevator Current State": data,
                 }
             )
-        reached_station = (
-            next_stop.to_station if next_stop.to_station else next_stop.from_station
-        )
-        served_reqs = ElevatorRequest.objects.filter(
-            (Q(to_station=reached_station) | Q(from_station=reached_station))
-            & Q(served_on=None)
-        )
-        served_reqs.update(served_on=timezone.now())
-        for req in served_reqs:
-            if req.to_station:
-                if req.to_station.under_maintenance_since is None:
-                    req.save()
-            if req.from_station:
-                if req.from_station.under_maintenance_since is None:
-                    req.save()
-
-        elevator_system.curr_direction = direction
-        elevator_system.curr_station = reached_station
-        elevator_system.save()
-        data = ElevatorSystemIntanceSerializer(elevator_system).data
         return Response(
             {
-                "message": f"Lift moved to floor #{reached_station.floor_no} successfully!",
+                "message": messages.ELEVATOR_MOVED.format(
+                    floor_no=reached_station.floor_no
+                ),
+                "Served Requests": served_req_ids,
                 "Elevator Current State": data,
             }
         )
@@ -118,41 +763,48 @@ class MoveElevator(APIView, GetElevatorSystemInstanceMixin):
 
 class CallElevator(APIView, GetElevatorSystemInstanceMixin):
     def patch(self, request, pk, from_floor_no):
-        elevator_system = get_object_or_404(ElevatorSystem, pk=pk)
+        elevator_system = get_object_or_404(self.queryset, pk=pk)
         curr_station = elevator_system.curr_station
-        stations = ElevatorStation.objects.filter(elevator_system=elevator_system).all()
-        data = ElevatorSystemIntanceSerializer(elevator_system).data
         if curr_station.floor_no == from_floor_no:
+            data = FastElevatorSystemStateSerializer(elevator_system).data
             return Response(
                 {
-                    "message": f"Elevator is already on the floor #{curr_station.floor_no}! You can select the destionation floor now!",
+                    "message": messages.ALREADY_ON_CALLED_FLOOR.format(
+                        floor_no=curr_station.floor_no
+                    ),
                     "Elevator Current State": data,
                 }
             )
-        from_station = stations.filter(floor_no=from_floor_no).first()
+        from_station = station_cache.get_station(elevator_system, from_floor_no)
         if not from_station:
-            data = ElevatorSystemIntanceSerializer(elevator_system).data
+            data = FastElevatorSystemStateSerializer(elevator_system).data
             return Response(
                 {
-                    "message": f"This Elevator System has only {elevator_system.stations_count} stations/floors.",
+                    "message": messages.STATIONS_COUNT_EXCEEDED.format(
+                        stations_count=elevator_system.stations_count
+                    ),
                     "Elevator Current State": data,
                 }
             )
         if from_station.under_maintenance_since:
+            data = FastElevatorSystemStateSerializer(elevator_system).data
             return Response(
                 {
-                    "message": f"Sorry! This floor #{curr_station.floor_no} elevator station is under maintenance!",
+                    "message": messages.CALLED_STATION_UNDER_MAINTENANCE.format(
+                        floor_no=curr_station.floor_no
+                    ),
                     "Elevator Current State": data,
                 }
             )
-        new_elevator_req = ElevatorRequest(
-            from_station=from_station, elevator_system=elevator_system
-        )
-        new_elevator_req.save()
-        data = ElevatorSystemIntanceSerializer(elevator_system).data
+        _, merged = ElevatorLogic.save_call(elevator_system, from_station)
+        data = FastElevatorSystemStateSerializer(elevator_system).data
         return Response(
             {
-                "message": "Elevator call request Saved! Elevator will reach this floor shortly!",
+                "message": (
+                    messages.CALL_MERGED.format(floor_no=from_floor_no)
+                    if merged
+                    else messages.CALL_SAVED
+                ),
                 "Elevator Current State": data,
             }
         )
@@ -160,56 +812,50 @@ class CallElevator(APIView, GetElevatorSystemInstanceMixin):
 
 class SelectFloorView(APIView, GetElevatorSystemInstanceMixin):
     def patch(self, request, pk, to_floor_no):
-        elevator_system = get_object_or_404(ElevatorSystem, pk=pk)
+        elevator_system = get_object_or_404(self.queryset, pk=pk)
         curr_station = elevator_system.curr_station
-        stations = ElevatorStation.objects.filter(elevator_system=elevator_system).all()
-        to_station = stations.filter(floor_no=to_floor_no).first()
-        data = ElevatorSystemIntanceSerializer(elevator_system).data
+        to_station = station_cache.get_station(elevator_system, to_floor_no)
         if not to_station:
-            data = ElevatorSystemIntanceSerializer(elevator_system).data
+            data = FastElevatorSystemStateSerializer(elevator_system).data
             return Response(
                 {
-                    "message": f"This Elevator System has only {elevator_system.stations_count} stations/floors.",
+                    "message": messages.STATIONS_COUNT_EXCEEDED.format(
+                        stations_count=elevator_system.stations_count
+                    ),
                     "Elevator Current State": data,
                 }
             )
         if to_station.under_maintenance_since:
+            data = FastElevatorSystemStateSerializer(elevator_system).data
             return Response(
                 {
-                    "message": f"The selected floor #{curr_station.floor_no} station is under maintenance! Please select a different floor!",
+                    "message": messages.SELECTED_STATION_UNDER_MAINTENANCE.format(
+                        floor_no=curr_station.floor_no
+                    ),
                     "Elevator Current State": data,
                 }
             )
         if curr_station.floor_no == to_floor_no:
+            data = FastElevatorSystemStateSerializer(elevator_system).data
             return Response(
                 {
-                    "message": f"Elevator is already on the floor #{curr_station.floor_no}! Please select a different floor!",
+                    "message": messages.ALREADY_ON_SELECTED_FLOOR.format(
+                        floor_no=curr_station.floor_no
+                    ),
                     "Elevator Current State": data,
                 }
             )
-        pending_elevator_req = ElevatorRequest.objects.filter(
-            from_station__floor_no=curr_station.floor_no, to_station=None
-        ).first()
-        if pending_elevator_req:
-            pending_elevator_req.to_station = to_station
-            pending_elevator_req.save()
-        else:
-            new_elevator_req = ElevatorRequest(
-                from_station=curr_station,
-                to_station=to_station,
-                elevator_system=elevator_system,
-            )
-            new_elevator_req.save()
-        data = ElevatorSystemIntanceSerializer(elevator_system).data
+        ElevatorLogic.save_select(elevator_system, to_station)
+        data = FastElevatorSystemStateSerializer(elevator_system).data
         return Response(
             {
-                "message": "Select Floor request Saved! Elevator will reach the selected floor shortly!",
+                "message": messages.SELECT_SAVED,
                 "Elevator Current State": data,
             }
         )
 
 
-class ElevatorStationVS(ReadOnlyModelViewSet):
+class ElevatorStationVS(ConditionalRetrieveMixin, ReadOnlyModelViewSet):
     """
     Elevator Station Read only view set
     """
@@ -220,15 +866,15 @@ class ElevatorStationVS(ReadOnlyModelViewSet):
 
 class MarkStationUnderMaintenanceView(APIView, GetElevatorSystemInstanceMixin):
     def patch(self, request, pk, floor_no, flag):
-        elevator_system = get_object_or_404(ElevatorSystem, pk=pk)
-        station = ElevatorStation.objects.filter(
-            elevator_system=elevator_system, floor_no=floor_no
-        ).first()
+        elevator_system = get_object_or_404(self.queryset, pk=pk)
+        station = station_cache.get_station(elevator_system, floor_no)
         if not station:
-            data = ElevatorSystemIntanceSerializer(elevator_system).data
+            data = FastElevatorSystemStateSerializer(elevator_system).data
             return Response(
                 {
-                    "message": f"This Elevator System has only {elevator_system.stations_count} stations/floors.",
+                    "message": messages.STATIONS_COUNT_EXCEEDED.format(
+                        stations_count=elevator_system.stations_count
+                    ),
                     "Elevator Current State": data,
                 }
             )
@@ -237,11 +883,48 @@ class MarkStationUnderMaintenanceView(APIView, GetElevatorSystemInstanceMixin):
                 station.under_maintenance_since = timezone.now()
         else:
             station.under_maintenance_since = None
-        station.save()
-        data = ElevatorSystemIntanceSerializer(elevator_system).data
+        ElevatorLogic.save_maintenance(elevator_system, station)
+        data = FastElevatorSystemStateSerializer(elevator_system).data
         return Response(
             {
-                "message": f'Station at floor #{floor_no} is {"marked" if flag else "unmarked"} under maintenance!',
+                "message": messages.MAINTENANCE_TOGGLED.format(
+                    floor_no=floor_no, marked="marked" if flag else "unmarked"
+                ),
                 "Elevator Current State": data,
             }
         )
+
+
+class SetSchedulingStrategyView(APIView, GetElevatorSystemInstanceMixin):
+    def patch(self, request, pk, strategy):
+        elevator_system = get_object_or_404(self.queryset, pk=pk)
+        strategy = strategy.upper()
+        if strategy not in SCHEDULING_STRATEGIES:
+            raise ValidationError(
+                {
+                    "scheduling_strategy": messages.UNKNOWN_SCHEDULING_STRATEGY.format(
+                        strategy=strategy, strategies=", ".join(SCHEDULING_STRATEGIES)
+                    )
+                }
+            )
+        elevator_system.scheduling_strategy = strategy
+        elevator_system.save(update_fields=["scheduling_strategy", "updated"])
+        ElevatorLogic.publish_state(elevator_system)
+        data = FastElevatorSystemStateSerializer(elevator_system).data
+        return Response(
+            {
+                "message": messages.SCHEDULING_STRATEGY_SET.format(strategy=strategy),
+                "Elevator Current State": data,
+            }
+        )
+
+
+class MetricsView(View):
+    """
+    The request metrics of this process, in the Prometheus text format.
+    """
+
+    def get(self, request):
+        return HttpResponse(
+            registry.render(), content_type="text/plain; version=0.0.4; charset=utf-8"
+        )
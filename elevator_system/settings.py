@@ -45,6 +45,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "elevator_app.middleware.MetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -137,4 +138,9 @@ REST_FRAMEWORK = {
 
 # load your envs here
 
-SKIPS_ALLOWED_PER_REQ = env("SKIPS_ALLOWED_PER_REQUEST")
+SKIPS_ALLOWED_PER_REQ = env.int("SKIPS_ALLOWED_PER_REQUEST", default=3)
+STATION_CACHE_SIZE = env.int("STATION_CACHE_SIZE", default=10_000)
+METRICS_SLOW_REQUEST_SECONDS = env.float("METRICS_SLOW_REQUEST_SECONDS", default=None)
+ARCHIVE_SERVED_REQUESTS_AFTER_DAYS = env.int(
+    "ARCHIVE_SERVED_REQUESTS_AFTER_DAYS", default=30
+)